@@ -1,6 +1,8 @@
 from flask import Flask, jsonify, request
 from routes import main, auth
 from utils.database import init_db, init_app
+from utils.indexes import ensure_indexes_in_background
+from utils.token_cache import TokenCache, verify_token
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -19,10 +21,17 @@ def create_app():
     # JWT configuration
     app.config['JWT_EXPIRATION_DELTA'] = timedelta(days=7)
     
+    # Verified tokens are cached so API requests skip the JWT decode
+    app.extensions['token_cache'] = TokenCache(int(os.getenv('TOKEN_CACHE_SIZE', '1024')))
+    
     # Initialize MongoDB
     init_db(app)
     init_app(app)
     
+    # Make sure the indexes the models rely on exist
+    if os.getenv('AUTO_CREATE_INDEXES', 'true').lower() == 'true':
+        ensure_indexes_in_background(app)
+    
     # Add version to app context
     @app.context_processor
     def inject_version():
@@ -59,9 +68,8 @@ def create_app():
             else:
                 return jsonify({'error': 'Invalid token format. Use "Bearer <token>"'}), 401
             
-            from models.user import UserModel
-            user_model = UserModel()
-            user_id = user_model.verify_token(token)
+            # Fast path: no database handle is needed to check a token
+            user_id = verify_token(token, app.config['SECRET_KEY'], app.extensions['token_cache'])
             
             if not user_id:
                 return jsonify({'error': 'Invalid or expired token'}), 401
@@ -0,0 +1,90 @@
+"""
+Benchmark budget spend evaluation: nested loops vs the prefix sum index
+
+Usage:
+    python benchmarks/budget_engine.py [--budgets 100] [--transactions 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.budgets import evaluate_budgets
+
+CATEGORIES = ["Food", "Transport", "Entertainment", "Utilities", "Rent", "Healthcare",
+              "Education", "Shopping", "Travel", "Personal Care", "Insurance", "Taxes"]
+
+def make_transactions(count, days=3 * 365):
+    """Generate random expense and income transactions over a date range"""
+    start = date(2022, 1, 1)
+    return [
+        {
+            "type": random.choice(["expense", "expense", "expense", "income"]),
+            "category": random.choice(CATEGORIES),
+            "account": "Bank Account",
+            "amount": round(random.uniform(10, 5000), 2),
+            "date": (start + timedelta(days=random.randrange(days))).strftime("%Y-%m-%d")
+        }
+        for _ in range(count)
+    ]
+
+def make_budgets(count, days=3 * 365):
+    """Generate random monthly-ish budgets"""
+    start = date(2022, 1, 1)
+    budgets = []
+    for _ in range(count):
+        begin = start + timedelta(days=random.randrange(days - 31))
+        budgets.append({
+            "category": random.choice(CATEGORIES),
+            "amount": 10000,
+            "start_date": begin.strftime("%Y-%m-%d"),
+            "end_date": (begin + timedelta(days=30)).strftime("%Y-%m-%d")
+        })
+    return budgets
+
+def nested_loop_spent(budgets, transactions):
+    """The original budgets x transactions evaluation"""
+    results = []
+    for budget in budgets:
+        spent = 0
+        for transaction in transactions:
+            if (transaction["type"] == "expense" and
+                transaction["category"] == budget["category"] and
+                budget["start_date"] <= transaction["date"] <= budget["end_date"]):
+                spent += transaction["amount"]
+        results.append(spent)
+    return results
+
+def timed(func, *args):
+    """Run a function and return its result and elapsed seconds"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budgets", type=int, default=100)
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    transactions = make_transactions(args.transactions)
+    budgets = make_budgets(args.budgets)
+
+    expected, loop_seconds = timed(nested_loop_spent, budgets, transactions)
+    evaluated, index_seconds = timed(evaluate_budgets, [dict(budget) for budget in budgets], transactions)
+
+    for budget, spent in zip(evaluated, expected):
+        assert abs(budget["spent"] - spent) < 0.01, (budget, spent)
+
+    print(f"{args.budgets} budgets x {args.transactions} transactions")
+    print(f"  nested loops:     {loop_seconds * 1000:10.1f} ms")
+    print(f"  prefix sum index: {index_seconds * 1000:10.1f} ms")
+    print(f"  speedup:          {loop_seconds / index_seconds:10.1f}x")
+
+if __name__ == "__main__":
+    main()
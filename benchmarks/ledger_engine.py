@@ -0,0 +1,70 @@
+"""
+Benchmark the NumPy ledger engine against the row-by-row Python code
+
+Usage:
+    python benchmarks/ledger_engine.py [--transactions 100000] [--budgets 100]
+"""
+import argparse
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.budget_engine import make_budgets, make_transactions, timed
+from utils.balances import calculate_balances, summarize_net_worth, transaction_deltas
+from utils.budgets import BudgetSpendIndex
+from utils.ledger_engine import LedgerColumns, period_ends, to_date
+
+ACCOUNTS = [{"account_type": "Bank Account", "initial_amount": 50000},
+            {"account_type": "Cash", "initial_amount": 1000}]
+
+def python_net_worth(transactions, points):
+    """Replay balances up to each point, as a row-by-row implementation would"""
+    ordered = sorted(transactions, key=lambda transaction: transaction["date"])
+    series, position = [], 0
+    balances = {account["account_type"]: account["initial_amount"] for account in ACCOUNTS}
+    for point in points:
+        while position < len(ordered) and ordered[position]["date"] <= point:
+            for account, delta in transaction_deltas(ordered[position]):
+                if account in balances:
+                    balances[account] += delta
+            position += 1
+        series.append(summarize_net_worth(ACCOUNTS, balances)[2])
+    return series
+
+def python_budget_spend(transactions, budgets):
+    """Budget spend with the prefix sum index, built once"""
+    index = BudgetSpendIndex(transactions)
+    return [index.spent(budget["category"], budget["start_date"], budget["end_date"]) for budget in budgets]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--budgets", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    transactions = make_transactions(args.transactions)
+    budgets = make_budgets(args.budgets)
+    points = [to_date(day) for day in period_ends("2022-01-01", "2024-12-31", "daily")]
+
+    ledger, load_seconds = timed(LedgerColumns, transactions)
+    rows = [
+        ("balances", lambda: calculate_balances(ACCOUNTS, transactions), lambda: ledger.balances(ACCOUNTS)),
+        ("budget spend", lambda: python_budget_spend(transactions, budgets),
+         lambda: (setattr(ledger, "_expense_index", None), ledger.budget_spend(budgets))),
+        ("daily net worth", lambda: python_net_worth(transactions, points),
+         lambda: ledger.net_worth_series(ACCOUNTS, points[0], points[-1], "daily")),
+    ]
+
+    print(f"{args.transactions} transactions, {args.budgets} budgets, {len(points)} daily points")
+    print(f"  load columns:     {load_seconds * 1000:10.1f} ms")
+    for name, python_version, numpy_version in rows:
+        _, python_seconds = timed(python_version)
+        _, numpy_seconds = timed(numpy_version)
+        print(f"  {name + ':':17} python {python_seconds * 1000:9.1f} ms  numpy {numpy_seconds * 1000:8.1f} ms"
+              f"  ({python_seconds / numpy_seconds:5.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Simple HTTP load generator for comparing serving modes
+
+Usage:
+    python benchmarks/load.py http://127.0.0.1:5000/login [--concurrency 16] [--seconds 10]
+"""
+import argparse
+import threading
+import time
+import urllib.request
+
+def worker(url, deadline, latencies, errors, headers):
+    """Request the URL in a loop until the deadline"""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            errors.append(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load generator")
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--token", help="Bearer token for /api/ endpoints")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(args.url, deadline, latencies, errors, headers))
+               for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+    print(f"{args.url} concurrency={args.concurrency}")
+    print(f"  requests: {len(latencies)}  errors: {len(errors)}  throughput: {len(latencies) / args.seconds:.1f} req/s")
+    print(f"  latency p50: {percentile(0.5):.1f} ms  p99: {percentile(0.99):.1f} ms")
+
+if __name__ == "__main__":
+    main()
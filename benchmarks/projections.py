@@ -0,0 +1,86 @@
+"""
+Benchmark bytes on the wire and BSON decode time for full documents vs projected views
+
+Usage:
+    python benchmarks/projections.py [--transactions 100000] [--description-length 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+import bson
+from bson import ObjectId
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.finance import VIEWS
+
+CATEGORIES = ["Food", "Transport", "Entertainment", "Utilities", "Rent", "Healthcare"]
+
+def make_transactions(count, description_length):
+    """Generate full transaction documents as stored by the app"""
+    start = date(2022, 1, 1)
+    user_id = str(ObjectId())
+    transactions = []
+    for _ in range(count):
+        transaction = {
+            "_id": ObjectId(),
+            "type": random.choice(["expense", "expense", "income", "transfer"]),
+            "date": (start + timedelta(days=random.randrange(3 * 365))).strftime("%Y-%m-%d"),
+            "amount": round(random.uniform(10, 5000), 2),
+            "description": "x" * random.randint(description_length // 2, description_length),
+            "added_date": "2024-01-01 12:00:00",
+            "category": random.choice(CATEGORIES),
+            "user_id": user_id
+        }
+        if transaction["type"] == "transfer":
+            transaction["from_account"] = "Bank Account"
+            transaction["to_account"] = "Cash"
+        else:
+            transaction["account"] = "Bank Account"
+        transactions.append(transaction)
+    return transactions
+
+def project(document, projection):
+    """Apply a simple inclusion or exclusion projection like the server does"""
+    if projection is None:
+        return document
+    included = {field for field, flag in projection.items() if flag and field != "_id"}
+    if included:
+        result = {field: document[field] for field in included if field in document}
+        if projection.get("_id", 1):
+            result = {"_id": document["_id"], **result}
+        return result
+    return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+def measure(transactions, projection, repeat=3):
+    """Return encoded size and best decode time for a view of the transactions"""
+    data = b"".join(bson.encode(project(transaction, projection)) for transaction in transactions)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        bson.decode_all(data)
+        best = min(best, time.perf_counter() - started)
+    return len(data), best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--description-length", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    transactions = make_transactions(args.transactions, args.description_length)
+
+    print(f"{args.transactions} transactions, descriptions up to {args.description_length} chars")
+    full_size, full_seconds = measure(transactions, None)
+    print(f"  {'full':8} {full_size / 1e6:8.1f} MB {full_seconds * 1000:8.1f} ms decode")
+    for view, projection in VIEWS["transactions"].items():
+        size, seconds = measure(transactions, projection)
+        print(f"  {view:8} {size / 1e6:8.1f} MB {seconds * 1000:8.1f} ms decode "
+              f"({size / full_size:.0%} of the bytes)")
+
+if __name__ == "__main__":
+    main()
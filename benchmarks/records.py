@@ -0,0 +1,88 @@
+"""
+Benchmark memory per transaction: full dicts, projected dicts and compact records
+
+Projected dicts and records decode the same 'record' projection, so the gap
+between those two rows is what the record type itself saves.
+
+Usage:
+    python benchmarks/records.py [--transactions 100000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+import bson
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.projections import make_transactions
+from models.finance import VIEWS
+from utils.balances import calculate_balances
+from utils.records import to_records
+
+ACCOUNTS = [{"account_type": "Bank Account", "initial_amount": 0}, {"account_type": "Cash", "initial_amount": 0}]
+
+def retained(build):
+    """Return the object built and the bytes it keeps alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--description-length", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    transactions = make_transactions(args.transactions, args.description_length)
+    full_bson = b"".join(bson.encode(transaction) for transaction in transactions)
+    projection = VIEWS["transactions"]["record"]
+    record_bson = b"".join(
+        bson.encode({field: transaction[field] for field, included in projection.items()
+                     if included and field in transaction})
+        for transaction in transactions
+    )
+    del transactions
+
+    count = args.transactions
+    rows = [
+        ("full dicts", lambda: bson.decode_all(full_bson)),
+        ("projected dicts", lambda: bson.decode_all(record_bson)),
+        ("records", lambda: to_records(bson.decode_all(record_bson))),
+    ]
+
+    print(f"{count} transactions")
+    expected = None
+    retained_bytes = {}
+    for label, build in rows:
+        transactions, retained_bytes[label] = retained(build)
+        del transactions
+        # Timed apart from the memory count, which tracemalloc slows down
+        started = time.perf_counter()
+        transactions = build()
+        decode_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        balances = calculate_balances(ACCOUNTS, transactions)
+        balance_seconds = time.perf_counter() - started
+        assert expected is None or balances == expected
+        expected = balances
+        del transactions
+
+        print(f"  {label + ':':17}{retained_bytes[label] / count:8.0f} bytes/transaction"
+              f"  decode {decode_seconds * 1000:7.1f} ms  balances {balance_seconds * 1000:7.1f} ms")
+
+    print(f"  projection saves:  {retained_bytes['full dicts'] / retained_bytes['projected dicts']:8.1f}x")
+    print(f"  records save:      {retained_bytes['projected dicts'] / retained_bytes['records']:8.1f}x")
+
+if __name__ == "__main__":
+    main()
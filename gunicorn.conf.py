@@ -0,0 +1,39 @@
+"""
+Gunicorn settings for serving PaisaTrack in production
+
+The app is loaded once in the master (preload) and then forked into worker
+processes, each running several threads. Send SIGHUP to the master for a
+graceful restart: new workers are started and old ones finish their
+in-flight requests before exiting.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('WEB_BIND', '127.0.0.1:5000')
+workers = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('WEB_THREADS', '4'))
+worker_class = 'gthread'
+
+# Load the app before forking so workers share its memory pages
+preload_app = True
+
+timeout = int(os.getenv('WEB_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Recycle workers now and then to cap memory growth; jitter avoids restarting them all at once
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.getenv('WEB_MAX_REQUESTS_JITTER', '500'))
+
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+
+def post_worker_init(worker):
+    """Open the worker's connection pool and pre-render its info page before it takes requests"""
+    from utils.warmup import warm_up
+    warm_up(worker.wsgi)
+
+def worker_exit(server, worker):
+    """Close the worker's pooled MongoDB connections"""
+    from utils.database import close_client
+    close_client()
@@ -7,6 +7,7 @@ from pymongo import MongoClient
 from datetime import datetime
 from dotenv import load_dotenv
 from werkzeug.security import generate_password_hash
+from utils.indexes import ensure_indexes
 
 # MongoDB connection
 load_dotenv()
@@ -326,6 +327,9 @@ def init_info():
             }
         }
     
+    # Version and update time let the app cache the rendered info page
+    info_data["version"] = 1
+    info_data["updated_at"] = datetime.utcnow()
     info_collection.insert_one(info_data)
     print(f"Initialized info data from finance_info.json (common data)")
 
@@ -333,6 +337,9 @@ def main():
     """Main initialization function"""
     print("Starting fresh initialization of MongoDB...")
     
+    # Create indexes for all collections
+    ensure_indexes(db)
+    
     # Initialize users and get user ID
     user_id = init_users()
     
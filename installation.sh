@@ -235,7 +235,9 @@ Type=simple
 User=www-data
 WorkingDirectory=/home/ubuntu/$REPO_NAME
 EnvironmentFile=/home/ubuntu/$REPO_NAME/.env
-ExecStart=/usr/bin/python3 /home/ubuntu/$REPO_NAME/app.py
+Environment=WEB_BIND=127.0.0.1:$PORT
+ExecStart=/usr/bin/python3 /home/ubuntu/$REPO_NAME/serve.py
+ExecReload=/bin/kill -HUP \$MAINPID
 Restart=always
 
 [Install]
@@ -271,6 +273,9 @@ echo ""
 print_status "To restart the application:"
 echo "  sudo systemctl restart paisatrack"
 echo ""
+print_status "To reload workers gracefully without dropping requests:"
+echo "  sudo systemctl reload paisatrack"
+echo ""
 print_status "New features include user authentication with JWT tokens."
 echo "Users can now register, login, and have their own private financial data."
 echo ""
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Maintenance commands for PaisaTrack data
+
+Usage:
+    python manage.py rebuild-balances [--user USER_ID]
+    python manage.py check-balances [--user USER_ID]
+    python manage.py rebuild-rollups [--user USER_ID]
+    python manage.py indexes [--check] [--background]
+    python manage.py import-transactions --user USER_ID FILE [--format csv|jsonl]
+    python manage.py snapshot-balances [--user USER_ID] [--every N]
+    python manage.py recompute [--user USER_ID] [--stores balances,rollups,history] [--workers N]
+                               [--checkpoint FILE] [--pause SECONDS]
+"""
+import argparse
+import sys
+import time
+from app import create_app
+from models.finance import FinanceModel
+from utils.database import get_db
+from utils.indexes import ensure_indexes, index_report
+from utils.importer import IMPORT_FORMATS, import_transactions as run_import, parse_column_map
+from utils.snapshots import SNAPSHOT_EVERY
+from utils.recompute import RECOMPUTE_STORES, recompute_users
+
+def get_user_ids(user_id=None):
+    """Return the requested user or every registered user"""
+    if user_id:
+        return [user_id]
+    return [str(user["_id"]) for user in get_db().users.find({}, {"_id": 1})]
+
+def rebuild_balances(args):
+    """Recompute materialized balances from transaction history"""
+    for user_id in get_user_ids(args.user):
+        balances = FinanceModel(user_id).rebuild_balances()
+        print(f"Rebuilt {len(balances)} balances for user {user_id}")
+    return 0
+
+def rebuild_rollups(args):
+    """Recompute daily spend rollups from transaction history"""
+    for user_id in get_user_ids(args.user):
+        count = FinanceModel(user_id).rebuild_rollups()
+        print(f"Rebuilt {count} rollups for user {user_id}")
+    return 0
+
+def check_balances(args):
+    """Compare materialized balances against a full replay"""
+    failures = 0
+    for user_id in get_user_ids(args.user):
+        mismatches = FinanceModel(user_id).check_balances()
+        for mismatch in mismatches:
+            print(f"User {user_id}: {mismatch['account_type']} materialized={mismatch['materialized']} "
+                  f"expected={mismatch['expected']}")
+        if mismatches:
+            failures += 1
+    print(f"Balance check finished: {failures} user(s) with mismatches")
+    return 1 if failures else 0
+
+def indexes(args):
+    """Create declared indexes and report missing or extra ones"""
+    db = get_db()
+    if not args.check:
+        created = ensure_indexes(db, background=args.background)
+        print(f"Ensured {len(created)} indexes")
+
+    problems = 0
+    for collection_name, report in index_report(db).items():
+        for name in report["missing"]:
+            print(f"{collection_name}: missing index {name}")
+            problems += 1
+        for name in report["extra"]:
+            print(f"{collection_name}: extra index {name}")
+    return 1 if problems else 0
+
+def import_transactions(args):
+    """Import transactions for a user from a CSV or JSON-lines file"""
+    file_format = args.format or ("jsonl" if args.file.lower().endswith((".jsonl", ".ndjson")) else "csv")
+
+    def progress(report):
+        print(f"{report['rows']} rows read, {report['imported']} imported, {report['failed']} failed")
+
+    with open(args.file, "r", encoding="utf-8-sig", newline="") as stream:
+        report = run_import(FinanceModel(args.user), stream, file_format, parse_column_map(args.map),
+                            progress=progress, batch_size=args.batch_size, date_format=args.date_format,
+                            add_categories=args.add_categories)
+    for error in report["errors"]:
+        print(f"Line {error['line']}: {error['error']}")
+    if report["failed"] > len(report["errors"]):
+        print(f"... and {report['failed'] - len(report['errors'])} more errors")
+    return 1 if report["failed"] else 0
+
+def snapshot_balances(args):
+    """Write the per-account balance snapshots each user is missing"""
+    for user_id in get_user_ids(args.user):
+        count = FinanceModel(user_id).build_account_snapshots(args.every)
+        print(f"Wrote {count} snapshots for user {user_id}")
+    return 0
+
+def recompute(args):
+    """Rebuild derived data for every user in parallel worker processes"""
+    stores = [store.strip() for store in args.stores.split(",") if store.strip()]
+    unknown = [store for store in stores if store not in RECOMPUTE_STORES]
+    if unknown:
+        print(f"Unknown stores: {', '.join(unknown)}. Use {', '.join(RECOMPUTE_STORES)}")
+        return 2
+
+    def progress(result, summary):
+        processed = summary["done"] + summary["failed"]
+        remaining = summary["users"] - summary["skipped"] - processed
+        elapsed = time.time() - summary["started"]
+        rate = processed / elapsed if elapsed else 0
+        eta = f"{remaining / rate:.0f}s" if rate else "?"
+        if result["error"]:
+            outcome = f"failed: {result['error']}"
+        else:
+            outcome = " ".join(f"{store}={count}" for store, count in result["counts"].items())
+        print(f"[{processed}/{summary['users'] - summary['skipped']}] user {result['user_id']} {outcome} "
+              f"({result['seconds']:.2f}s, {rate:.1f} users/s, eta {eta})")
+
+    summary = recompute_users(get_user_ids(args.user), stores, workers=args.workers, checkpoint=args.checkpoint,
+                              pause=args.pause, progress=progress)
+    print(f"Recompute finished: {summary['done']} done, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped from checkpoint, {summary['retried']} retried "
+          f"in {summary['seconds']:.1f}s")
+    return 1 if summary["failed"] else 0
+
+def main(argv=None):
+    """Parse arguments and run the requested command"""
+    parser = argparse.ArgumentParser(description="PaisaTrack maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild-balances", help="Recompute materialized balances")
+    rebuild_parser.add_argument("--user", help="Only process this user ID")
+    rebuild_parser.set_defaults(handler=rebuild_balances)
+
+    check_parser = subparsers.add_parser("check-balances", help="Verify materialized balances")
+    check_parser.add_argument("--user", help="Only process this user ID")
+    check_parser.set_defaults(handler=check_balances)
+
+    rollups_parser = subparsers.add_parser("rebuild-rollups", help="Recompute daily spend rollups")
+    rollups_parser.add_argument("--user", help="Only process this user ID")
+    rollups_parser.set_defaults(handler=rebuild_rollups)
+
+    indexes_parser = subparsers.add_parser("indexes", help="Create and report collection indexes")
+    indexes_parser.add_argument("--check", action="store_true", help="Only report, do not create indexes")
+    indexes_parser.add_argument("--background", action="store_true", help="Build indexes in the background")
+    indexes_parser.set_defaults(handler=indexes)
+
+    import_parser = subparsers.add_parser("import-transactions", help="Import transactions from a file")
+    import_parser.add_argument("--user", required=True, help="User ID to import into")
+    import_parser.add_argument("file", help="CSV or JSON-lines file")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="File format (default: from the extension)")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Transactions per insert")
+    import_parser.add_argument("--date-format", default="%Y-%m-%d", help="strptime format of the date column")
+    import_parser.add_argument("--map", default="", help='Column renames, e.g. "Txn Date=date,Debit=amount"')
+    import_parser.add_argument("--add-categories", action="store_true", help="Add unknown categories")
+    import_parser.set_defaults(handler=import_transactions)
+
+    snapshot_parser = subparsers.add_parser("snapshot-balances", help="Write per-account balance snapshots")
+    snapshot_parser.add_argument("--user", help="Only process this user ID")
+    snapshot_parser.add_argument("--every", type=int, default=SNAPSHOT_EVERY,
+                                 help="Also snapshot after this many transactions on an account")
+    snapshot_parser.set_defaults(handler=snapshot_balances)
+
+    recompute_parser = subparsers.add_parser("recompute", help="Rebuild derived data for all users in parallel")
+    recompute_parser.add_argument("--user", help="Only process this user ID")
+    recompute_parser.add_argument("--stores", default="balances,rollups,history",
+                                  help="Comma-separated stores to rebuild (balances, rollups, history)")
+    recompute_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    recompute_parser.add_argument("--checkpoint", help="File recording finished users, reused to resume a run")
+    recompute_parser.add_argument("--pause", type=float, default=0,
+                                  help="Seconds each worker waits between users to throttle load")
+    recompute_parser.set_defaults(handler=recompute)
+
+    args = parser.parse_args(argv)
+    app = create_app()
+    with app.app_context():
+        return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
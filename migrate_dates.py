@@ -0,0 +1,120 @@
+"""
+Script to backfill native date fields on existing transactions and budgets
+
+Documents are processed in _id order in small batches, so the app can keep
+running while it works. Each update only applies if the string dates are
+unchanged, so edits made in the meantime are never overwritten (the app
+already writes native dates itself). When every document has been migrated
+the app switches its date range queries to the native fields. Dates
+that do not parse are listed and keep the switch from happening.
+
+Usage:
+    python migrate_dates.py [--batch-size 1000] [--pause 0.1]
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+from utils.dates import MIGRATION_ID, NATIVE_DATE_FIELDS, SCHEMA_VERSION, native_date_fields
+from utils.indexes import ensure_indexes
+
+# MongoDB connection
+load_dotenv()
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+client = MongoClient(MONGO_URI)
+db = client['paisatrackIN']
+
+# Collections
+migrations_collection = db['schema_migrations']
+
+def migrate_collection(collection_name, batch_size=1000, pause=0.1):
+    """Add native dates to every document of a collection that lacks them
+
+    Returns the number migrated, the number still pending and the
+    (_id, field, value) of dates that do not parse.
+    """
+    collection = db[collection_name]
+    string_fields = list(NATIVE_DATE_FIELDS[collection_name])
+    projection = {field: 1 for field in string_fields}
+    pending = {"schema_version": {"$ne": SCHEMA_VERSION}}
+
+    last_id = None
+    updated = 0
+    invalid = []
+    while True:
+        query = dict(pending)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(collection.find(query, projection).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for document in batch:
+            strings = {field: document[field] for field in string_fields if field in document}
+            native = native_date_fields(collection_name, strings)
+            if native["schema_version"] is None:
+                # Left pending, a document without its native date would drop out of range queries
+                invalid.extend((document["_id"], field, value) for field, value in strings.items()
+                               if native[NATIVE_DATE_FIELDS[collection_name][field][0]] is None)
+                continue
+            # Matching the strings too means a concurrent edit wins over the backfill
+            operations.append(UpdateOne(
+                {"_id": document["_id"], **{field: strings.get(field) for field in string_fields}},
+                {"$set": native}
+            ))
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        last_id = batch[-1]["_id"]
+        print(f"{collection_name}: {updated} documents migrated")
+
+        # Give the primary some room between batches
+        if pause:
+            time.sleep(pause)
+
+    remaining = collection.count_documents(pending)
+    return updated, remaining, invalid
+
+def main():
+    """Main migration function"""
+    parser = argparse.ArgumentParser(description="Backfill native date fields")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per bulk update")
+    parser.add_argument("--pause", type=float, default=0.1, help="Seconds to wait between batches")
+    args = parser.parse_args()
+
+    print("Starting native date migration...")
+
+    # Indexes on the native fields are built first so they are ready when queries switch
+    ensure_indexes(db)
+
+    remaining = 0
+    invalid = 0
+    for collection_name in NATIVE_DATE_FIELDS:
+        updated, left, bad_dates = migrate_collection(collection_name, args.batch_size, args.pause)
+        print(f"{collection_name}: {updated} migrated, {left} remaining")
+        for document_id, field, value in bad_dates:
+            print(f"{collection_name} {document_id}: {field} {value!r} is not a valid date")
+        remaining += left
+        invalid += len(bad_dates)
+
+    if invalid:
+        # Queries stay on the string dates until every document can be found by its native date
+        print(f"{invalid} dates could not be parsed, fix those documents and run the script again")
+        return
+    if remaining:
+        # Documents edited during the run are picked up by running the script again
+        print(f"{remaining} documents still need migrating, run the script again")
+        return
+
+    migrations_collection.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"complete": True, "completed_at": datetime.utcnow(), "schema_version": SCHEMA_VERSION}},
+        upsert=True
+    )
+    print("Native date migration completed successfully!")
+
+if __name__ == "__main__":
+    main()
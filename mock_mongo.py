@@ -0,0 +1,52 @@
+"""
+In-memory MongoDB for tests that run FinanceModel against a database
+
+mongomock is a test-only dependency, so tests check ``available`` and skip
+without it. Two shims cover what mongomock lacks: the ``sort`` argument
+pymongo passes to bulk replace/update operations, and ``$switch`` branches
+that return arrays, which get_account_totals uses.
+"""
+import sys
+import os
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('AUTO_CREATE_INDEXES', 'false')
+
+from flask import g
+from models.finance import FinanceModel
+from utils.balances import sum_deltas
+from utils.database import DATABASE_NAME
+
+try:
+    import mongomock
+    from mongomock.collection import BulkOperationBuilder
+except ImportError:
+    mongomock = None
+
+available = mongomock is not None
+
+def _drop_sort(method):
+    def add(self, *args, **kwargs):
+        kwargs.pop("sort", None)
+        return method(self, *args, **kwargs)
+    return add
+
+if available:
+    BulkOperationBuilder.add_update = _drop_sort(BulkOperationBuilder.add_update)
+    BulkOperationBuilder.add_replace = _drop_sort(BulkOperationBuilder.add_replace)
+
+class MockFinanceModel(FinanceModel):
+    """FinanceModel whose account totals are summed in Python instead of by $switch"""
+
+    def get_account_totals(self):
+        transactions = self.transactions_collection.find({"user_id": self.user_id})
+        return {account: {"net": net} for account, net in sum_deltas(transactions).items()}
+
+@contextmanager
+def mock_database():
+    """Run the block in an app context whose get_db() is an empty in-memory database"""
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        g.db = mongomock.MongoClient()[DATABASE_NAME]
+        yield g.db
@@ -0,0 +1,98 @@
+import asyncio
+from utils.async_database import get_async_db
+from models.finance import NEWEST_FIRST, resolve_projection
+
+class AsyncFinanceModel:
+    """Read-only asyncio counterpart of FinanceModel for the dashboard API"""
+
+    def __init__(self, user_id):
+        self.db = get_async_db()
+        self.accounts_collection = self.db.accounts
+        self.transactions_collection = self.db.transactions
+        self.budgets_collection = self.db.budgets
+        self.balances_collection = self.db.balances
+        self.rollups_collection = self.db.spend_rollups
+        self.ledger_state_collection = self.db.ledger_state
+        self.user_id = user_id
+
+    async def get_accounts(self):
+        """Get all accounts for the user"""
+        return await self.accounts_collection.find({"user_id": self.user_id}, resolve_projection("accounts")).to_list()
+
+    async def get_stored_balances(self):
+        """Get the materialized balance of every account"""
+        docs = await self.balances_collection.find({"user_id": self.user_id}).to_list()
+        return {doc["account_type"]: doc["balance"] for doc in docs}
+
+    async def get_ledger_state(self):
+        """Get the per-user record of which derived stores have been built"""
+        return await self.ledger_state_collection.find_one({"user_id": self.user_id}) or {}
+
+    async def get_transactions(self, filter_query=None, sort=None, limit=0, projection=None):
+        """Get transactions with optional filter, sort order, limit and projection"""
+        query = dict(filter_query or {}, user_id=self.user_id)
+        cursor = self.transactions_collection.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list()
+
+    async def get_budgets(self, filter_query=None, view=None):
+        """Get budgets with optional filter for the user, optionally limited to a view's fields"""
+        query = dict(filter_query or {}, user_id=self.user_id)
+        return await self.budgets_collection.find(query, resolve_projection("budgets", view)).to_list()
+
+    async def get_budget_rollups(self, budgets):
+        """Get the expense rollups covering the periods and categories of some budgets"""
+        if not budgets:
+            return []
+        query = {
+            "user_id": self.user_id,
+            "type": "expense",
+            "category": {"$in": list({budget["category"] for budget in budgets})},
+            "date": {
+                "$gte": min(budget["start_date"] for budget in budgets),
+                "$lte": max(budget["end_date"] for budget in budgets)
+            }
+        }
+        return await self.rollups_collection.find(
+            query, {"_id": 0, "category": 1, "type": 1, "date": 1, "amount": 1}
+        ).to_list()
+
+    async def load_dashboard_data(self, sections, budget_filter=None):
+        """Load dashboard data with independent queries running concurrently
+
+        Returns None when the user's balances or rollups have not been built
+        yet, so the caller can fall back to FinanceModel which builds them.
+        """
+        needs_balances = 'summary' in sections or 'accounts' in sections
+        queries = {'state': self.get_ledger_state()}
+        if needs_balances:
+            queries['accounts'] = self.get_accounts()
+            queries['stored_balances'] = self.get_stored_balances()
+        if 'recent-transactions' in sections:
+            queries['recent_transactions'] = self.get_transactions(sort=NEWEST_FIRST, limit=10,
+                                                                  projection=resolve_projection('transactions', 'list'))
+        if 'budgets' in sections:
+            queries['budgets'] = self.get_budgets(budget_filter, view='budget')
+
+        try:
+            data = dict(zip(queries, await asyncio.gather(*queries.values())))
+            state = data.pop('state')
+            if needs_balances and not state.get('balances_built_at'):
+                return None
+            if 'budgets' in sections and not state.get('rollups_built_at'):
+                return None
+
+            if needs_balances:
+                stored = data.pop('stored_balances')
+                data['balances'] = {account['account_type']: stored.get(account['account_type'], 0)
+                                    for account in data['accounts']}
+            if 'budgets' in sections:
+                # Rollups depend on the budgets, so they are the only second round trip
+                data['rollups'] = await self.get_budget_rollups(data['budgets'])
+            return data
+        except Exception as e:
+            print(f"Error loading dashboard data: {e}")
+            return None
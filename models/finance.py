@@ -1,9 +1,82 @@
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from utils.database import get_db
+from utils.balances import calculate_balances, sum_deltas
+from utils.rollups import rollup_deltas
+from utils.pagination import keyset_after
+from utils.cache import TTLCache
+from utils.defaults import default_categories, default_info, load_json_file
+from utils.info_page import info_page
+from utils.records import TransactionRecord
+from utils.ledger_engine import LedgerColumns, month_ends, to_date, to_days
+from utils.reports import report_pipeline, report_rows
+from utils.snapshots import SNAPSHOT_EVERY, account_delta, account_filter, accounts_touched, snapshot_points
+from utils.dates import MIGRATION_ID, add_native_dates, date_range_query, hidden_fields, parse_date
 from bson import ObjectId
-import json
+from pymongo import DeleteMany, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
 
+# Sort order for transaction lists, newest first
+NEWEST_FIRST = [("date", -1), ("_id", -1)]
+OLDEST_FIRST = [("date", 1), ("_id", 1)]
+
+# Named projections so each read only transfers the fields its caller uses
+VIEWS = {
+    "accounts": {
+        # Balances and net worth only need the type and opening amount
+        "balance": {"_id": 0, "account_type": 1, "initial_amount": 1},
+    },
+    "transactions": {
+        "list": {"user_id": 0, "added_date": 0},
+        "export": {"user_id": 0},
+        # Balance, budget and analytics computations all read compact records
+        "record": {"_id": 0, "type": 1, "date": 1, "amount": 1, "category": 1,
+                   "account": 1, "from_account": 1, "to_account": 1},
+    },
+    "budgets": {
+        # Dashboard budget rows only show the spend against these
+        "budget": {"category": 1, "amount": 1, "start_date": 1, "end_date": 1},
+        "list": {"user_id": 0},
+    },
+}
+
+def resolve_projection(collection_name, view=None, projection=None):
+    """Return an explicit projection, or the one for a named view of a collection
+
+    Views that exclude fields (and reads without a view) also leave out the
+    native date fields, so callers see documents in their original shape.
+    """
+    if projection is not None:
+        return projection
+    if view is None:
+        projection = {}
+    else:
+        try:
+            projection = VIEWS[collection_name][view]
+        except KeyError:
+            raise ValueError(f"Unknown {collection_name} view: {view}")
+    if not any(projection.values()):
+        projection = {**projection, **{field: 0 for field in hidden_fields(collection_name)}}
+    return projection or None
+
+# Times a derived store rebuild is retried when a write overlaps it
+REBUILD_ATTEMPTS = 3
+
+# A write lease older than this was left by a worker killed mid-write, so rebuilds ignore it
+WRITE_LEASE_TIMEOUT = timedelta(seconds=2 * int(os.getenv('WEB_TIMEOUT', '60')))
+
+# Whether migrate_dates.py has finished, rechecked every few minutes until it has
+migration_cache = TTLCache(ttl=300, max_size=8)
+
+# Categories are read on almost every page, so keep them per user in memory
+category_cache = TTLCache(ttl=int(os.getenv('CATEGORY_CACHE_TTL', '60')),
+                          max_size=int(os.getenv('CATEGORY_CACHE_SIZE', '1024')))
+
+# Reports are keyed by the user's data version, so any write makes them miss
+report_cache = TTLCache(ttl=int(os.getenv('REPORT_CACHE_TTL', '300')),
+                        max_size=int(os.getenv('REPORT_CACHE_SIZE', '1024')))
+
 class FinanceModel:
     def __init__(self, user_id=None):
         self.db = get_db()
@@ -12,34 +85,40 @@ class FinanceModel:
         self.budgets_collection = self.db.budgets
         self.categories_collection = self.db.categories
         self.info_collection = self.db.info
+        self.balances_collection = self.db.balances
+        self.rollups_collection = self.db.spend_rollups
+        self.ledger_state_collection = self.db.ledger_state
+        self.checkpoints_collection = self.db.balance_checkpoints
+        self.snapshots_collection = self.db.account_snapshots
         self.user_id = user_id
+        self._ledger_state = None
     
     def load_json_file(self, filename):
         """Load data from JSON file"""
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                return json.load(f)
-        return None
+        return load_json_file(filename)
     
     # Account methods
-    def get_accounts(self):
-        """Get all accounts for the user"""
+    def get_accounts(self, view=None, projection=None):
+        """Get all accounts for the user, optionally limited to a view's fields"""
+        projection = resolve_projection("accounts", view, projection)
         try:
             if self.user_id:
-                return list(self.accounts_collection.find({"user_id": self.user_id}))
+                return list(self.accounts_collection.find({"user_id": self.user_id}, projection))
             else:
-                return list(self.accounts_collection.find())
+                return list(self.accounts_collection.find({}, projection))
         except Exception as e:
             print(f"Error getting accounts: {e}")
             return []
     
-    def get_account(self, account_type):
+    def get_account(self, account_type, view=None, projection=None):
         """Get a specific account for the user"""
+        projection = resolve_projection("accounts", view, projection)
         try:
             if self.user_id:
-                return self.accounts_collection.find_one({"account_type": account_type, "user_id": self.user_id})
+                return self.accounts_collection.find_one({"account_type": account_type, "user_id": self.user_id},
+                                                         projection)
             else:
-                return self.accounts_collection.find_one({"account_type": account_type})
+                return self.accounts_collection.find_one({"account_type": account_type}, projection)
         except Exception as e:
             print(f"Error getting account {account_type}: {e}")
             return None
@@ -50,7 +129,11 @@ class FinanceModel:
             return None
         try:
             account_data["user_id"] = self.user_id
-            return self.accounts_collection.insert_one(account_data)
+            with self._ledger_write():
+                result = self.accounts_collection.insert_one(account_data)
+                self._apply_balance_deltas({account_data["account_type"]: account_data.get("initial_amount", 0)})
+                self._bump_data_version()
+            return result
         except Exception as e:
             print(f"Error creating account: {e}")
             return None
@@ -60,10 +143,21 @@ class FinanceModel:
         if not self.user_id:
             return None
         try:
-            return self.accounts_collection.update_one(
-                {"account_type": account_type, "user_id": self.user_id},
-                {"$set": account_data}
-            )
+            with self._ledger_write():
+                previous = self.accounts_collection.find_one_and_update(
+                    {"account_type": account_type, "user_id": self.user_id},
+                    {"$set": account_data},
+                    return_document=ReturnDocument.BEFORE
+                )
+                if previous:
+                    # Move the initial amount in case it or the account type changed
+                    deltas = {previous["account_type"]: -previous.get("initial_amount", 0)}
+                    new_type = account_data.get("account_type", previous["account_type"])
+                    new_amount = account_data.get("initial_amount", previous.get("initial_amount", 0))
+                    deltas[new_type] = deltas.get(new_type, 0) + new_amount
+                    self._apply_balance_deltas(deltas)
+                    self._bump_data_version()
+            return previous
         except Exception as e:
             print(f"Error updating account {account_type}: {e}")
             return None
@@ -73,29 +167,105 @@ class FinanceModel:
         if not self.user_id:
             return None
         try:
-            return self.accounts_collection.delete_one({"account_type": account_type, "user_id": self.user_id})
+            with self._ledger_write():
+                deleted = self.accounts_collection.find_one_and_delete({"account_type": account_type, "user_id": self.user_id})
+                if deleted:
+                    self._apply_balance_deltas({account_type: -deleted.get("initial_amount", 0)})
+                    self._bump_data_version()
+            return deleted
         except Exception as e:
             print(f"Error deleting account {account_type}: {e}")
             return None
     
     # Transaction methods
-    def get_transactions(self, filter_query=None):
-        """Get transactions with optional filter for the user"""
+    def get_transactions(self, filter_query=None, sort=None, skip=0, limit=0, projection=None, view=None):
+        """Get transactions with optional filter, sort order, page window and projection for the user"""
+        projection = resolve_projection("transactions", view, projection)
         try:
             if filter_query is None:
                 filter_query = {}
             filter_query["user_id"] = self.user_id
-            return list(self.transactions_collection.find(filter_query))
+            cursor = self.transactions_collection.find(filter_query, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if skip:
+                cursor = cursor.skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
         except Exception as e:
             print(f"Error getting transactions: {e}")
             return []
     
-    def get_transaction(self, transaction_id):
+    def iter_transactions(self, filter_query=None, sort=OLDEST_FIRST, projection=None, batch_size=1000, view=None):
+        """Yield matching transactions straight from the cursor, one batch in memory at a time"""
+        projection = resolve_projection("transactions", view, projection)
+        if filter_query is None:
+            filter_query = {}
+        filter_query["user_id"] = self.user_id
+        cursor = self.transactions_collection.find(filter_query, projection, sort=sort, batch_size=batch_size)
+        try:
+            yield from cursor
+        finally:
+            # Release the server-side cursor if the consumer stops early
+            cursor.close()
+    
+    def iter_transaction_records(self, filter_query=None, sort=None, batch_size=1000):
+        """Yield compact TransactionRecords for computations, one cursor batch held at a time
+
+        The 'record' view keeps each decoded document down to the fields a
+        record carries, and the dict is dropped as soon as its record is built.
+        """
+        if filter_query is None:
+            filter_query = {}
+        filter_query["user_id"] = self.user_id
+        cursor = self.transactions_collection.find(filter_query, VIEWS["transactions"]["record"],
+                                                   sort=sort, batch_size=batch_size)
+        try:
+            for document in cursor:
+                yield TransactionRecord.from_document(document)
+        finally:
+            cursor.close()
+    
+    def get_transaction_records(self, filter_query=None, sort=None):
+        """Get matching transactions as a list of compact TransactionRecords"""
+        try:
+            return list(self.iter_transaction_records(filter_query, sort))
+        except Exception as e:
+            print(f"Error getting transaction records: {e}")
+            return []
+    
+    def get_ledger(self, filter_query=None):
+        """Load matching transactions into NumPy columns for vectorized analytics"""
+        return LedgerColumns(self.iter_transaction_records(filter_query, sort=OLDEST_FIRST))
+    
+    def get_transactions_page(self, filter_query=None, after=None, limit=50, view=None):
+        """Get one newest-first page of transactions after a (date, _id) sort key"""
+        if filter_query is None:
+            filter_query = {}
+        if after is not None:
+            # Wrap in $and so a filter with its own $or keeps working
+            filter_query = {"$and": [filter_query, keyset_after(*after)]}
+        return self.get_transactions(filter_query, sort=NEWEST_FIRST, limit=limit, view=view)
+    
+    def count_transactions(self, filter_query=None):
+        """Count transactions matching an optional filter for the user"""
+        try:
+            if filter_query is None:
+                filter_query = {}
+            filter_query["user_id"] = self.user_id
+            return self.transactions_collection.count_documents(filter_query)
+        except Exception as e:
+            print(f"Error counting transactions: {e}")
+            return 0
+    
+    def get_transaction(self, transaction_id, view=None, projection=None):
         """Get a specific transaction for the user"""
         if not self.user_id:
             return None
+        projection = resolve_projection("transactions", view, projection)
         try:
-            return self.transactions_collection.find_one({"_id": transaction_id, "user_id": self.user_id})
+            return self.transactions_collection.find_one({"_id": transaction_id, "user_id": self.user_id}, projection)
         except Exception as e:
             print(f"Error getting transaction {transaction_id}: {e}")
             return None
@@ -106,7 +276,11 @@ class FinanceModel:
             return None
         try:
             transaction_data["user_id"] = self.user_id
-            return self.transactions_collection.insert_one(transaction_data)
+            add_native_dates("transactions", transaction_data)
+            with self._ledger_write():
+                result = self.transactions_collection.insert_one(transaction_data)
+                self._apply_transaction_changes(added=[transaction_data])
+            return result
         except Exception as e:
             print(f"Error creating transaction: {e}")
             return None
@@ -116,10 +290,17 @@ class FinanceModel:
         if not self.user_id:
             return None
         try:
-            return self.transactions_collection.update_one(
-                {"_id": transaction_id, "user_id": self.user_id},
-                {"$set": transaction_data}
-            )
+            add_native_dates("transactions", transaction_data, partial=True)
+            with self._ledger_write():
+                previous = self.transactions_collection.find_one_and_update(
+                    {"_id": transaction_id, "user_id": self.user_id},
+                    {"$set": transaction_data},
+                    return_document=ReturnDocument.BEFORE
+                )
+                if previous:
+                    # Reverse the old effect and apply the new one in a single step
+                    self._apply_transaction_changes(added=[{**previous, **transaction_data}], removed=[previous])
+            return previous
         except Exception as e:
             print(f"Error updating transaction {transaction_id}: {e}")
             return None
@@ -129,29 +310,644 @@ class FinanceModel:
         if not self.user_id:
             return None
         try:
-            return self.transactions_collection.delete_one({"_id": transaction_id, "user_id": self.user_id})
+            with self._ledger_write():
+                deleted = self.transactions_collection.find_one_and_delete({"_id": transaction_id, "user_id": self.user_id})
+                if deleted:
+                    self._apply_transaction_changes(removed=[deleted])
+            return deleted
         except Exception as e:
             print(f"Error deleting transaction {transaction_id}: {e}")
             return None
     
+    def insert_transactions(self, transactions):
+        """Insert a batch of transactions and update derived data once for the batch
+
+        Returns the number inserted and a list of (batch index, error message)
+        for documents the server rejected.
+        """
+        if not self.user_id or not transactions:
+            return 0, []
+        for transaction in transactions:
+            transaction["user_id"] = self.user_id
+            add_native_dates("transactions", transaction)
+        errors = []
+        with self._ledger_write():
+            try:
+                # Unordered so one bad document does not stop the rest of the batch
+                self.transactions_collection.insert_many(transactions, ordered=False)
+            except BulkWriteError as e:
+                errors = [(error["index"], error.get("errmsg", "Insert failed"))
+                          for error in e.details.get("writeErrors", [])]
+            except Exception as e:
+                print(f"Error inserting transactions: {e}")
+                return 0, [(index, str(e)) for index in range(len(transactions))]
+            failed = {index for index, _ in errors}
+            inserted = [transaction for index, transaction in enumerate(transactions) if index not in failed]
+            if inserted:
+                self._apply_transaction_changes(added=inserted)
+        return len(inserted), errors
+    
+    def _apply_transaction_changes(self, added=(), removed=()):
+        """Keep the balance store and spend rollups in step with transaction writes"""
+        deltas = sum_deltas(added)
+        for account, delta in sum_deltas(removed, sign=-1).items():
+            deltas[account] = deltas.get(account, 0) + delta
+        self._apply_balance_deltas(deltas)
+        self._apply_rollup_deltas(rollup_deltas(added, removed))
+        self._bump_data_version()
+        # After the version bump, so a history or snapshot build racing this write notices one or the other
+        since = min(transaction["date"] for transaction in [*added, *removed])
+        self._invalidate_checkpoints(since)
+        self._invalidate_snapshots(accounts_touched([*added, *removed]), since)
+    
+    # Derived data state
+    def _get_ledger_state(self):
+        """Get the per-user record of which derived stores have been built"""
+        if self._ledger_state is None:
+            self._ledger_state = self.ledger_state_collection.find_one({"user_id": self.user_id}) or {}
+        return self._ledger_state
+
+    def _mark_built(self, store):
+        """Record that a derived store was rebuilt from transaction history"""
+        built_at = datetime.now()
+        self.ledger_state_collection.update_one(
+            {"user_id": self.user_id},
+            {"$set": {f"{store}_built_at": built_at}},
+            upsert=True
+        )
+        self._get_ledger_state()[f"{store}_built_at"] = built_at
+
+    @contextmanager
+    def _ledger_write(self):
+        """Hold a write lease on the user's ledger while a write to transactions or accounts runs
+
+        A rebuild that sees no live lease and the same data version before
+        and after cannot have raced a write, since every such write bumps
+        the version before it releases its lease. Leases carry their start
+        time, so one left behind by a killed worker expires instead of
+        blocking rebuilds for good.
+        """
+        lease = {"_id": ObjectId(), "started_at": datetime.now()}
+        self.ledger_state_collection.update_one(
+            {"user_id": self.user_id},
+            {"$push": {"write_leases": lease}},
+            upsert=True
+        )
+        try:
+            yield
+        finally:
+            self.ledger_state_collection.update_one(
+                {"user_id": self.user_id},
+                {"$pull": {"write_leases": {"_id": lease["_id"]}}}
+            )
+            self._ledger_state = None
+
+    def _get_write_state(self):
+        """Get the user's data version and number of live write leases, dropping expired ones"""
+        state = self.ledger_state_collection.find_one(
+            {"user_id": self.user_id}, {"data_version": 1, "write_leases": 1}
+        ) or {}
+        leases = state.get("write_leases", [])
+        expired = datetime.now() - WRITE_LEASE_TIMEOUT
+        live = [lease for lease in leases if lease["started_at"] >= expired]
+        if len(live) < len(leases):
+            self.ledger_state_collection.update_one(
+                {"user_id": self.user_id},
+                {"$pull": {"write_leases": {"started_at": {"$lt": expired}}}}
+            )
+        return state.get("data_version", 0), len(live)
+
+    def _rebuild_store(self, store, build):
+        """Rebuild a derived store and mark it built, unless a write overlapped every attempt
+
+        A write landing between the aggregation and the replace would be lost
+        (or counted twice), so the rebuild is retried. If it keeps racing,
+        the built flag is cleared and the next read rebuilds again.
+        """
+        for _ in range(REBUILD_ATTEMPTS):
+            before = self._get_write_state()
+            result = build()
+            if before[1] == 0 and self._get_write_state() == before:
+                self._mark_built(store)
+                return result
+        self.ledger_state_collection.update_one({"user_id": self.user_id}, {"$unset": {f"{store}_built_at": ""}})
+        self._ledger_state = None
+        return result
+
+    def _replace_user_documents(self, collection, key_fields, documents):
+        """Swap a user's derived documents for rebuilt ones in one bulk write
+
+        Rebuilt documents are upserted and stamped, then the ones without the
+        stamp are deleted, so readers never find the store empty mid-rebuild.
+        """
+        rebuild_id = ObjectId()
+        operations = [
+            ReplaceOne(
+                {"user_id": self.user_id, **{field: document[field] for field in key_fields}},
+                {**document, "rebuild_id": rebuild_id},
+                upsert=True
+            )
+            for document in documents
+        ]
+        operations.append(DeleteMany({"user_id": self.user_id, "rebuild_id": {"$ne": rebuild_id}}))
+        collection.bulk_write(operations, ordered=True)
+
+    def _bump_data_version(self):
+        """Record that the user's data changed so cached responses become stale"""
+        self.ledger_state_collection.update_one(
+            {"user_id": self.user_id},
+            {"$inc": {"data_version": 1}},
+            upsert=True
+        )
+        self._ledger_state = None
+
+    def get_data_version(self):
+        """Get the user's data version, which every write increases"""
+        try:
+            state = self.ledger_state_collection.find_one({"user_id": self.user_id}, {"data_version": 1})
+            return (state or {}).get("data_version", 0)
+        except Exception as e:
+            print(f"Error getting data version: {e}")
+            return None
+
+    # Balance methods
+    def _apply_balance_deltas(self, deltas):
+        """Adjust the materialized account balances with atomic $inc updates"""
+        operations = [
+            UpdateOne(
+                {"user_id": self.user_id, "account_type": account},
+                {"$inc": {"balance": delta}},
+                upsert=True
+            )
+            for account, delta in deltas.items()
+        ]
+        if operations:
+            self.balances_collection.bulk_write(operations, ordered=False)
+
+    def get_account_totals(self):
+        """Get per-account income, expense and transfer totals computed inside MongoDB"""
+        def entry(account_field, kind):
+            return {"account": account_field, "kind": kind, "amount": "$amount"}
+
+        def total(kind):
+            return {"$sum": {"$cond": [{"$eq": ["$entries.kind", kind]}, "$entries.amount", 0]}}
+
+        pipeline = [
+            {"$match": {"user_id": self.user_id}},
+            # Turn each transaction into the account entries it affects, the same
+            # way utils.balances.transaction_deltas does. A credit card payment
+            # moves money out of the paying account and into the card, so it
+            # lands in the transfer_out/transfer_in totals like any transfer.
+            {"$project": {"entries": {"$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$type", "income"]},
+                     "then": [entry("$account", "income")]},
+                    {"case": {"$eq": ["$type", "expense"]},
+                     "then": [entry("$account", "expense")]},
+                    {"case": {"$eq": ["$type", "transfer"]},
+                     "then": [entry("$from_account", "transfer_out"), entry("$to_account", "transfer_in")]}
+                ],
+                "default": []
+            }}}},
+            {"$unwind": "$entries"},
+            {"$group": {
+                "_id": "$entries.account",
+                "income": total("income"),
+                "expense": total("expense"),
+                "transfer_in": total("transfer_in"),
+                "transfer_out": total("transfer_out")
+            }}
+        ]
+
+        totals = {}
+        for doc in self.transactions_collection.aggregate(pipeline):
+            if doc["_id"]:
+                account = doc.pop("_id")
+                doc["net"] = doc["income"] - doc["expense"] + doc["transfer_in"] - doc["transfer_out"]
+                totals[account] = doc
+        return totals
+
+    def compute_balances(self, accounts=None):
+        """Calculate balances from the aggregated account totals without loading transactions"""
+        if accounts is None:
+            accounts = self.get_accounts(view="balance")
+        balances = {account["account_type"]: account["initial_amount"] for account in accounts}
+        for account, totals in self.get_account_totals().items():
+            if account in balances:
+                balances[account] += totals["net"]
+        return balances
+
+    def get_balances(self, accounts=None):
+        """Get current balances from the materialized balance store"""
+        if accounts is None:
+            accounts = self.get_accounts(view="balance")
+        if not self.user_id:
+            # Nothing is materialized without a user, so total the transactions directly
+            return self.compute_balances(accounts)
+        try:
+            if not self._get_ledger_state().get("balances_built_at"):
+                # Balances were never materialized for this user, build them once
+                stored = self.rebuild_balances()
+            else:
+                stored = {
+                    doc["account_type"]: doc["balance"]
+                    for doc in self.balances_collection.find({"user_id": self.user_id})
+                }
+            return {account["account_type"]: stored.get(account["account_type"], 0) for account in accounts}
+        except Exception as e:
+            print(f"Error getting balances: {e}")
+            return self.compute_balances(accounts)
+
+    def rebuild_balances(self):
+        """Recompute the materialized balances from the full transaction history"""
+        if not self.user_id:
+            return {}
+
+        def build():
+            # Transactions on unknown accounts are kept so a later account picks them up
+            balances = {account: totals["net"] for account, totals in self.get_account_totals().items()}
+            for account in self.get_accounts(view="balance"):
+                balances[account["account_type"]] = balances.get(account["account_type"], 0) + account.get("initial_amount", 0)
+
+            self._replace_user_documents(self.balances_collection, ["account_type"], [
+                {"user_id": self.user_id, "account_type": account, "balance": balance}
+                for account, balance in balances.items()
+            ])
+            return balances
+
+        return self._rebuild_store("balances", build)
+
+    def check_balances(self, tolerance=0.005):
+        """Compare materialized balances against a full replay and return the differences"""
+        accounts = self.get_accounts(view="balance")
+        expected = calculate_balances(accounts, self.iter_transaction_records())
+        stored = {
+            doc["account_type"]: doc["balance"]
+            for doc in self.balances_collection.find({"user_id": self.user_id})
+        }
+
+        mismatches = []
+        for account_type, balance in expected.items():
+            materialized = stored.get(account_type)
+            if materialized is None or abs(materialized - balance) > tolerance:
+                mismatches.append({
+                    "account_type": account_type,
+                    "materialized": materialized,
+                    "expected": balance
+                })
+        return mismatches
+
+    # Spend rollup methods
+    def _apply_rollup_deltas(self, deltas):
+        """Adjust the daily spend rollups with upserted $inc updates"""
+        operations = [
+            UpdateOne(
+                {"user_id": self.user_id, "category": category, "type": transaction_type, "date": date},
+                {"$inc": {"amount": amount, "count": count}},
+                upsert=True
+            )
+            for (category, transaction_type, date), (amount, count) in deltas.items()
+        ]
+        if operations:
+            self.rollups_collection.bulk_write(operations, ordered=False)
+            if any(count < 0 for _, count in deltas.values()):
+                # Drop rollups whose last transaction was removed
+                self.rollups_collection.delete_many({"user_id": self.user_id, "count": {"$lte": 0}})
+
+    def rebuild_rollups(self):
+        """Recompute the daily spend rollups from the full transaction history"""
+        if not self.user_id:
+            return 0
+        pipeline = [
+            {"$match": {"user_id": self.user_id}},
+            {"$group": {
+                "_id": {"category": "$category", "type": "$type", "date": "$date"},
+                "amount": {"$sum": "$amount"},
+                "count": {"$sum": 1}
+            }}
+        ]
+
+        def build():
+            rollups = [
+                {
+                    "user_id": self.user_id,
+                    "category": doc["_id"].get("category", ""),
+                    "type": doc["_id"]["type"],
+                    "date": doc["_id"]["date"],
+                    "amount": doc["amount"],
+                    "count": doc["count"]
+                }
+                for doc in self.transactions_collection.aggregate(pipeline)
+            ]
+            self._replace_user_documents(self.rollups_collection, ["category", "type", "date"], rollups)
+            return len(rollups)
+
+        return self._rebuild_store("rollups", build)
+
+    def get_spend_rollups(self, start_date, end_date, categories=None, transaction_type="expense"):
+        """Get daily rollups between two dates (inclusive), shaped like transactions"""
+        try:
+            query = {
+                "user_id": self.user_id,
+                "type": transaction_type,
+                "date": {"$gte": start_date, "$lte": end_date}
+            }
+            if categories is not None:
+                query["category"] = {"$in": list(categories)}
+            if not self.user_id:
+                # Nothing is materialized without a user, so group the transactions directly
+                return self._group_daily_spend(query)
+            if not self._get_ledger_state().get("rollups_built_at"):
+                self.rebuild_rollups()
+            return list(self.rollups_collection.find(
+                query, {"_id": 0, "category": 1, "type": 1, "date": 1, "amount": 1}
+            ))
+        except Exception as e:
+            print(f"Error getting spend rollups: {e}")
+            return []
+
+    def _group_daily_spend(self, query):
+        """Sum the transactions matching a query per category and date inside MongoDB"""
+        pipeline = [
+            {"$match": query},
+            {"$group": {
+                "_id": {"category": "$category", "date": "$date"},
+                "amount": {"$sum": "$amount"}
+            }}
+        ]
+        return [
+            {
+                "category": doc["_id"].get("category", ""),
+                "type": query["type"],
+                "date": doc["_id"]["date"],
+                "amount": doc["amount"]
+            }
+            for doc in self.transactions_collection.aggregate(pipeline)
+        ]
+
+    def get_category_spend(self, category, start_date, end_date, transaction_type="expense"):
+        """Sum of one category between two dates (inclusive)"""
+        rollups = self.get_spend_rollups(start_date, end_date, [category], transaction_type)
+        return sum(rollup["amount"] for rollup in rollups)
+
+    def get_category_totals(self, start_date, end_date, transaction_type="expense"):
+        """Sum of every category between two dates (inclusive)"""
+        totals = {}
+        for rollup in self.get_spend_rollups(start_date, end_date, transaction_type=transaction_type):
+            totals[rollup["category"]] = totals.get(rollup["category"], 0) + rollup["amount"]
+        return totals
+
+    def get_budget_rollups(self, budgets):
+        """Get the expense rollups covering the periods and categories of some budgets"""
+        if not budgets:
+            return []
+        return self.get_spend_rollups(
+            min(budget["start_date"] for budget in budgets),
+            max(budget["end_date"] for budget in budgets),
+            {budget["category"] for budget in budgets}
+        )
+
+    # Report methods
+    def get_report(self, report="monthly", start_date=None, end_date=None):
+        """Income, expense and net per month or per category between two dates (inclusive)"""
+        version = self.get_data_version()
+        key = (self.user_id, report, start_date, end_date, version)
+        if version is not None:
+            cached = report_cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            native = self.native_dates_ready()
+            match = {"user_id": self.user_id, **self.transaction_date_filter(start_date, end_date)}
+            groups = self.transactions_collection.aggregate(report_pipeline(match, report, native))
+            result = report_rows(groups, report)
+        except Exception as e:
+            print(f"Error building {report} report: {e}")
+            return None
+
+        if version is not None:
+            report_cache.set(key, result)
+        return result
+
+    def get_monthly_report(self, start_date=None, end_date=None):
+        """Income, expense and net per YYYY-MM month between two dates (inclusive)"""
+        return self.get_report("monthly", start_date, end_date)
+
+    def get_category_report(self, start_date=None, end_date=None):
+        """Income, expense and net per category between two dates (inclusive)"""
+        return self.get_report("by-category", start_date, end_date)
+
+    # Net worth history methods
+    def _get_checkpoint_before(self, day):
+        """Get the latest month-end balance checkpoint dated before a YYYY-MM-DD day"""
+        return self.checkpoints_collection.find_one(
+            {"user_id": self.user_id, "date": {"$lt": day}},
+            {"_id": 0, "date": 1, "balances": 1},
+            sort=[("date", -1)]
+        )
+
+    def _save_checkpoints(self, names, points, matrix):
+        """Store the cumulative transaction deltas of each account at some month ends"""
+        built_at = datetime.now()
+        operations = []
+        for day, row in zip(points.tolist(), matrix.tolist()):
+            # A list rather than a dict, account names may contain "." or "$"
+            balances = [{"account_type": name, "delta": delta} for name, delta in zip(names, row)]
+            operations.append(UpdateOne(
+                {"user_id": self.user_id, "date": to_date(day)},
+                {"$set": {"balances": balances, "built_at": built_at}},
+                upsert=True
+            ))
+        if operations:
+            self.checkpoints_collection.bulk_write(operations, ordered=False)
+
+    def _invalidate_checkpoints(self, day):
+        """Drop checkpoints of the month containing a changed transaction date and every later month"""
+        try:
+            self.checkpoints_collection.delete_many({"user_id": self.user_id, "date": {"$gte": day}})
+        except Exception as e:
+            print(f"Error invalidating balance checkpoints: {e}")
+
+    def get_net_worth_history(self, start_date, end_date, frequency="monthly"):
+        """Assets, liabilities and net worth at the end of each period between two dates (inclusive)
+
+        Starts from the last month-end checkpoint before start_date and only
+        loads the transactions after it, then stores checkpoints for the
+        completed months it passed so later requests start further on.
+        """
+        try:
+            version = self.get_data_version()
+            accounts = self.get_accounts(view="balance")
+            checkpoint = self._get_checkpoint_before(start_date)
+            base = {}
+            date_filter = {"$lte": end_date}
+            if checkpoint:
+                base = {entry["account_type"]: entry["delta"] for entry in checkpoint["balances"]}
+                date_filter["$gt"] = checkpoint["date"]
+            ledger = self.get_ledger({"date": date_filter})
+
+            # Every account seen so far, current or not, so checkpoints stay valid after account changes
+            names = sorted(set(base) | set(ledger.accounts.values))
+            if len(ledger):
+                first_day = int(to_days(checkpoint["date"])) + 1 if checkpoint else int(ledger.day.min())
+                last_complete = datetime.now().replace(day=1).strftime("%Y-%m-%d")
+                points = month_ends(to_date(first_day), min(end_date, last_complete))
+                if len(points):
+                    cumulative = [{"account_type": name, "initial_amount": base.get(name, 0)} for name in names]
+                    self._save_checkpoints(names, points, ledger.balance_matrix(cumulative, points))
+                    if self.get_data_version() != version:
+                        # A write landed while we read, it may be missing from what was saved
+                        self._invalidate_checkpoints(to_date(points[0]))
+
+            series_accounts = [
+                {**account, "initial_amount": account.get("initial_amount", 0) + base.get(account["account_type"], 0)}
+                for account in accounts
+            ]
+            return ledger.net_worth_series(series_accounts, start_date, end_date, frequency)
+        except Exception as e:
+            print(f"Error getting net worth history: {e}")
+            return None
+
+    # Balance snapshot methods
+    def _get_account_snapshot(self, account_type, day=None):
+        """Get an account's latest snapshot, or its latest one dated on or before a YYYY-MM-DD day"""
+        query = {"user_id": self.user_id, "account_type": account_type}
+        if day:
+            query["date"] = {"$lte": day}
+        return self.snapshots_collection.find_one(query, {"_id": 0, "date": 1, "delta": 1}, sort=[("date", -1)])
+
+    def _invalidate_snapshots(self, accounts, day):
+        """Drop snapshots of some accounts dated on or after a changed transaction date"""
+        if not accounts:
+            return
+        try:
+            self.snapshots_collection.delete_many(
+                {"user_id": self.user_id, "account_type": {"$in": list(accounts)}, "date": {"$gte": day}}
+            )
+        except Exception as e:
+            print(f"Error invalidating account snapshots: {e}")
+
+    def get_balance_as_of(self, account_type, day):
+        """Balance of an account at the end of a YYYY-MM-DD day, or None if the account does not exist
+
+        Only the transactions after the nearest earlier snapshot are read, so
+        the cost does not grow with the length of the account's history.
+        """
+        try:
+            account = self.get_account(account_type, view="balance")
+            if not account:
+                return None
+            snapshot = self._get_account_snapshot(account_type, day)
+            date_filter = {"$lte": day}
+            delta = 0
+            if snapshot:
+                date_filter["$gt"] = snapshot["date"]
+                delta = snapshot["delta"]
+            replayed = 0
+            for transaction in self.iter_transaction_records(account_filter(account_type, date_filter), sort=OLDEST_FIRST):
+                delta += account_delta(transaction, account_type)
+                replayed += 1
+            return {
+                "account_type": account_type,
+                "date": day,
+                "balance": account.get("initial_amount", 0) + delta,
+                "snapshot_date": snapshot["date"] if snapshot else None,
+                "transactions_replayed": replayed
+            }
+        except Exception as e:
+            print(f"Error getting balance of {account_type} as of {day}: {e}")
+            return None
+
+    def build_account_snapshots(self, every=SNAPSHOT_EVERY):
+        """Write the snapshots each account is missing since its latest one and return how many"""
+        written = 0
+        version = self.get_data_version()
+        for account in self.get_accounts(view="balance"):
+            account_type = account["account_type"]
+            latest = self._get_account_snapshot(account_type)
+            date_filter = {"$gt": latest["date"]} if latest else None
+            transactions = self.iter_transaction_records(account_filter(account_type, date_filter), sort=OLDEST_FIRST)
+            snapshots = list(snapshot_points(transactions, account_type, latest["delta"] if latest else 0, every))
+            if not snapshots:
+                continue
+            built_at = datetime.now()
+            self.snapshots_collection.bulk_write([
+                UpdateOne(
+                    {"user_id": self.user_id, "account_type": account_type, "date": day},
+                    {"$set": {"delta": delta, "transactions": count, "built_at": built_at}},
+                    upsert=True
+                )
+                for day, delta, count in snapshots
+            ], ordered=False)
+            written += len(snapshots)
+
+            current = self.get_data_version()
+            if current != version:
+                # A write landed while we read, it may be missing from what was saved
+                self._invalidate_snapshots([account_type], snapshots[0][0])
+                version = current
+        return written
+
+    def rebuild_balance_history(self, every=SNAPSHOT_EVERY):
+        """Drop net worth checkpoints and account snapshots, then write the snapshots again"""
+        if not self.user_id:
+            return 0
+        # Checkpoints are rebuilt on the next history request
+        self.checkpoints_collection.delete_many({"user_id": self.user_id})
+        self.snapshots_collection.delete_many({"user_id": self.user_id})
+        return self.build_account_snapshots(every)
+
+    # Date queries
+    def native_dates_ready(self):
+        """Whether every transaction and budget has native date fields"""
+        ready = migration_cache.get(MIGRATION_ID)
+        if ready is None:
+            try:
+                ready = self.db.schema_migrations.find_one({"_id": MIGRATION_ID, "complete": True}) is not None
+            except Exception as e:
+                print(f"Error checking date migration: {e}")
+                ready = False
+            migration_cache.set(MIGRATION_ID, ready)
+        return ready
+    
+    def transaction_date_filter(self, start_date=None, end_date=None, native=None):
+        """Filter transactions between two YYYY-MM-DD dates (inclusive)
+
+        Reads sorted on ``date`` pass ``native=False``, so the range and the
+        sort walk the same (user_id, date, _id) index.
+        """
+        if native is None:
+            native = self.native_dates_ready()
+        return date_range_query(start_date, end_date, "date", "date_at", native=native)
+    
+    def active_budget_filter(self, day):
+        """Filter budgets whose period includes a YYYY-MM-DD day"""
+        if self.native_dates_ready():
+            day = parse_date(day)
+            return {"start_at": {"$lte": day}, "end_at": {"$gte": day}}
+        return {"start_date": {"$lte": day}, "end_date": {"$gte": day}}
+    
     # Budget methods
-    def get_budgets(self, filter_query=None):
-        """Get budgets with optional filter for the user"""
+    def get_budgets(self, filter_query=None, view=None, projection=None):
+        """Get budgets with optional filter for the user, optionally limited to a view's fields"""
+        projection = resolve_projection("budgets", view, projection)
         try:
             if filter_query is None:
                 filter_query = {}
             filter_query["user_id"] = self.user_id
-            return list(self.budgets_collection.find(filter_query))
+            return list(self.budgets_collection.find(filter_query, projection))
         except Exception as e:
             print(f"Error getting budgets: {e}")
             return []
     
-    def get_budget(self, budget_id):
+    def get_budget(self, budget_id, view=None, projection=None):
         """Get a specific budget for the user"""
         if not self.user_id:
             return None
+        projection = resolve_projection("budgets", view, projection)
         try:
-            return self.budgets_collection.find_one({"_id": budget_id, "user_id": self.user_id})
+            return self.budgets_collection.find_one({"_id": budget_id, "user_id": self.user_id}, projection)
         except Exception as e:
             print(f"Error getting budget {budget_id}: {e}")
             return None
@@ -162,7 +958,10 @@ class FinanceModel:
             return None
         try:
             budget_data["user_id"] = self.user_id
-            return self.budgets_collection.insert_one(budget_data)
+            add_native_dates("budgets", budget_data)
+            result = self.budgets_collection.insert_one(budget_data)
+            self._bump_data_version()
+            return result
         except Exception as e:
             print(f"Error creating budget: {e}")
             return None
@@ -172,10 +971,14 @@ class FinanceModel:
         if not self.user_id:
             return None
         try:
-            return self.budgets_collection.update_one(
+            add_native_dates("budgets", budget_data, partial=True)
+            result = self.budgets_collection.update_one(
                 {"_id": budget_id, "user_id": self.user_id},
                 {"$set": budget_data}
             )
+            if result.matched_count:
+                self._bump_data_version()
+            return result
         except Exception as e:
             print(f"Error updating budget {budget_id}: {e}")
             return None
@@ -185,47 +988,42 @@ class FinanceModel:
         if not self.user_id:
             return None
         try:
-            return self.budgets_collection.delete_one({"_id": budget_id, "user_id": self.user_id})
+            result = self.budgets_collection.delete_one({"_id": budget_id, "user_id": self.user_id})
+            if result.deleted_count:
+                self._bump_data_version()
+            return result
         except Exception as e:
             print(f"Error deleting budget {budget_id}: {e}")
             return None
     
     # Category methods
-    def get_categories(self):
-        """Get all categories for the user"""
+    def get_categories(self, fresh=False):
+        """Get all categories for the user, skipping the cache when fresh is set"""
         if not self.user_id:
             # Return default categories if no user is authenticated
-            return self.load_json_file('categories.json') or self.get_default_categories()
+            return default_categories()
+        
+        # Another worker may have changed them within the cache TTL, so checks before a write read the database
+        categories = None if fresh else category_cache.get(self.user_id)
+        if categories is not None:
+            return categories
         
         try:
-            categories = self.categories_collection.find_one({"user_id": self.user_id})
-            if categories:
-                if '_id' in categories:
-                    del categories['_id']
-                if 'user_id' in categories:
-                    del categories['user_id']
-                return categories
+            categories = self.categories_collection.find_one({"user_id": self.user_id}, {"_id": 0, "user_id": 0})
+            if not categories:
+                # Fall back to the defaults if no categories in database
+                categories = default_categories()
+            category_cache.set(self.user_id, categories)
+            return categories
         except Exception as e:
             print(f"Error getting categories: {e}")
         
-        # Load from JSON file if no categories in database
-        categories_data = self.load_json_file('categories.json')
-        if categories_data:
-            return categories_data
-        
-        # Return default categories if none exist or error occurred
-        return self.get_default_categories()
+        # Return default categories if an error occurred
+        return default_categories()
 
     def get_default_categories(self):
         """Returns a default set of categories."""
-        return {
-            "income": ["Salary", "Freelance", "Investment", "Gift", "Business", "Bonus", "Dividend", "Rental Income", "Other"],
-            "expense": ["Food", "Transport", "Entertainment", "Utilities", "Rent", "Healthcare", 
-                       "Education", "Shopping", "Travel", "Personal Care", "Insurance", "Taxes", 
-                       "Subscriptions", "Maintenance", "Charity", "Other"],
-            "transfer": ["Cash to Bank", "Bank to Card", "Card to Cash", "Between Accounts", 
-                        "Credit Card Payment", "Bank Transfer", "Investment Transfer", "Loan Payment"]
-        }
+        return default_categories()
     
     def update_categories(self, categories_data):
         """Update categories for the user"""
@@ -239,10 +1037,39 @@ class FinanceModel:
             update_data = {"$set": categories_data}
             
             # Use upsert to create if it doesn't exist or update if it does
-            return self.categories_collection.update_one(query, update_data, upsert=True)
+            result = self.categories_collection.update_one(query, update_data, upsert=True)
+            category_cache.invalidate(self.user_id)
+            self._bump_data_version()
+            return result
+        except Exception as e:
+            print(f"Error updating categories: {e}")
+            category_cache.invalidate(self.user_id)
+            return None
+    
+    def _change_category_list(self, update):
+        """Apply an atomic update to the user's category lists, starting from the defaults if there are none"""
+        if not self.user_id:
+            return None
+        try:
+            query = {"user_id": self.user_id}
+            # Lists another worker changed are left alone, unlike a $set of the whole document
+            self.categories_collection.update_one(query, {"$setOnInsert": default_categories()}, upsert=True)
+            result = self.categories_collection.update_one(query, update)
+            category_cache.invalidate(self.user_id)
+            self._bump_data_version()
+            return result
         except Exception as e:
             print(f"Error updating categories: {e}")
+            category_cache.invalidate(self.user_id)
             return None
+
+    def add_categories(self, category_type, names):
+        """Add category names to one category list, skipping ones already there"""
+        return self._change_category_list({"$addToSet": {category_type: {"$each": list(names)}}})
+
+    def remove_category(self, category_type, name):
+        """Remove a category name from one category list"""
+        return self._change_category_list({"$pull": {category_type: name}})
     
     # Info methods (common for all users)
     def get_info(self):
@@ -255,19 +1082,35 @@ class FinanceModel:
             print(f"Error getting info: {e}")
         
         # Return default info if none exists or error occurred
-        return self.load_json_file("finance_info.json")
+        return default_info()
+    
+    def get_info_version(self):
+        """Get the version and last update time of the info document"""
+        try:
+            info = self.info_collection.find_one({}, {"version": 1, "updated_at": 1})
+            if info:
+                # init_mongo.py replaces the document, so its _id is part of the version
+                return (str(info["_id"]), info.get("version", 0)), info.get("updated_at")
+        except Exception as e:
+            print(f"Error getting info version: {e}")
+        return None, None
     
     def update_info(self, info_data):
         """Update info data - common for all users"""
         try:
-            existing = self.info_collection.find_one()
+            info_data = {key: value for key, value in info_data.items() if key not in ("_id", "version")}
+            info_data["updated_at"] = datetime.utcnow()
+            existing = self.info_collection.find_one({}, {"_id": 1})
             if existing:
-                return self.info_collection.update_one(
+                result = self.info_collection.update_one(
                     {"_id": existing["_id"]},
-                    {"$set": info_data}
+                    {"$set": info_data, "$inc": {"version": 1}}
                 )
             else:
-                return self.info_collection.insert_one(info_data)
+                info_data["version"] = 1
+                result = self.info_collection.insert_one(info_data)
+            info_page.invalidate()
+            return result
         except Exception as e:
             print(f"Error updating info: {e}")
             return None
@@ -282,17 +1125,18 @@ class FinanceModel:
             # Check if categories exist for the user
             categories_exist = self.categories_collection.find_one({"user_id": self.user_id})
             if not categories_exist:
-                default_categories = self.load_json_file('categories.json') or self.get_default_categories()
+                categories = default_categories()
                 
                 # Add user_id to the default categories
-                default_categories["user_id"] = self.user_id
-                self.categories_collection.insert_one(default_categories)
+                categories["user_id"] = self.user_id
+                self.categories_collection.insert_one(categories)
+                category_cache.invalidate(self.user_id)
             
             # Check if info exists (common for all users)
             info_exist = self.info_collection.find_one()
             if not info_exist:
-                default_info = self.load_json_file('finance_info.json')
-                if default_info:
-                    self.info_collection.insert_one(default_info)
+                info = default_info()
+                if info:
+                    self.info_collection.insert_one(info)
         except Exception as e:
             print(f"Error initializing default data: {e}")
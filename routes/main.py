@@ -1,7 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, g
-from models.finance import FinanceModel
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, g, session, make_response, stream_with_context
+from models.finance import FinanceModel, NEWEST_FIRST, OLDEST_FIRST
+from models.async_finance import AsyncFinanceModel
+from utils.balances import summarize_net_worth
+from utils.budgets import evaluate_budgets
+from utils.pagination import encode_cursor, decode_cursor
+from utils.async_database import run_async
+from utils.info_page import info_page
+from utils.validation import build_transaction
+from utils.importer import IMPORT_FORMATS, import_transactions, parse_column_map
+from utils.export import EXPORT_FORMATS, export_transactions
+from utils.ledger_engine import FREQUENCIES
 from datetime import datetime, timedelta
 import calendar
+import hashlib
+import io
 
 main = Blueprint('main', __name__)
 
@@ -16,42 +28,6 @@ def require_auth():
     user_id = getattr(g, 'user_id', None)
     return user_id is not None
 
-def calculate_balances(accounts, transactions):
-    """Calculate current balance for all accounts"""
-    # Initialize balances with initial amounts
-    balances = {account['account_type']: account['initial_amount'] for account in accounts}
-    
-    # Process all transactions
-    for transaction in transactions:
-        if transaction["type"] == "income":
-            if transaction["account"] in balances:
-                balances[transaction["account"]] += transaction["amount"]
-        
-        elif transaction["type"] == "expense":
-            if transaction["account"] in balances:
-                balances[transaction["account"]] -= transaction["amount"]
-        
-        elif transaction["type"] == "transfer":
-            # Special handling for credit card payments
-            if transaction["category"] == "Credit Card Payment" and transaction["to_account"] == "Credit Card":
-                # Paying off credit card debt (reducing liability)
-                if transaction["from_account"] in balances:
-                    balances[transaction["from_account"]] -= transaction["amount"]
-                
-                if transaction["to_account"] in balances:
-                    # For credit cards, reducing debt means increasing the balance (towards zero)
-                    # Since credit card balances are negative, we ADD to reduce the debt
-                    balances[transaction["to_account"]] += transaction["amount"]
-            else:
-                # Regular transfer
-                if transaction["from_account"] in balances:
-                    balances[transaction["from_account"]] -= transaction["amount"]
-                
-                if transaction["to_account"] in balances:
-                    balances[transaction["to_account"]] += transaction["amount"]
-    
-    return balances
-
 @main.route('/')
 def index():
     """Public home page - shows help and information only"""
@@ -72,34 +48,14 @@ def dashboard():
     # If not authenticated, these will be empty lists
     try:
         accounts = model.get_accounts()
-        transactions = model.get_transactions()
+        # The template lists the last few transactions added, oldest of them first
+        transactions = model.get_transactions(sort=[('_id', -1)], limit=5, view='list')[::-1]
         
-        # Calculate current balances
-        balances = calculate_balances(accounts, transactions)
+        # Current balances come from the materialized balance store
+        balances = model.get_balances(accounts)
         
         # Calculate total assets, liabilities, and net worth
-        total_assets = 0
-        total_liabilities = 0
-        
-        for account_type, balance in balances.items():
-            account = next((acc for acc in accounts if acc['account_type'] == account_type), None)
-            if account:
-                if account_type == "Credit Card":
-                    # For credit cards, the balance represents debt (negative value)
-                    # Liability is the absolute value of the negative balance
-                    if balance < 0:
-                        total_liabilities += abs(balance)
-                    else:
-                        # If balance is positive, it means we've overpaid (credit)
-                        # This should count as a negative liability (asset)
-                        total_liabilities -= balance  # Subtract because it's a credit
-                else:
-                    if balance >= 0:
-                        total_assets += balance
-                    else:
-                        total_liabilities += abs(balance)
-        
-        net_worth = total_assets - total_liabilities
+        total_assets, total_liabilities, net_worth = summarize_net_worth(accounts, balances)
         
         return render_template('dashboard.html', 
                               accounts=accounts, 
@@ -120,123 +76,147 @@ def dashboard():
                               net_worth=0)
 
 # API endpoints for dashboard data
-@main.route('/api/dashboard/summary')
-def api_dashboard_summary():
-    """API endpoint for dashboard summary data"""
+DASHBOARD_SECTIONS = ['summary', 'accounts', 'recent-transactions', 'budgets']
+
+def serialize_document(document):
+    """Make a MongoDB document JSON serializable"""
+    if '_id' in document:
+        document['_id'] = str(document['_id'])
+    return document
+
+def load_dashboard_data(model, sections):
+    """Load the data needed by the requested dashboard sections once"""
+    data = {}
+    
+    if 'summary' in sections or 'accounts' in sections:
+        data['accounts'] = model.get_accounts()
+        # Current balances come from the materialized balance store
+        data['balances'] = model.get_balances(data['accounts'])
+    
+    if 'recent-transactions' in sections:
+        data['recent_transactions'] = model.get_transactions(sort=NEWEST_FIRST, limit=10, view='list')
+    
+    if 'budgets' in sections:
+        # Only budgets running today are shown, so let the database pick them
+        data['budgets'] = model.get_budgets(model.active_budget_filter(datetime.now().strftime('%Y-%m-%d')),
+                                           view='budget')
+        # Daily spend rollups stand in for the raw expense transactions
+        data['rollups'] = model.get_budget_rollups(data['budgets'])
+    
+    return data
+
+def load_dashboard_data_concurrently(sections):
+    """Load dashboard data through the async model, gathering independent queries"""
+    budget_filter = get_model().active_budget_filter(datetime.now().strftime('%Y-%m-%d'))
+    data = run_async(AsyncFinanceModel(g.user_id).load_dashboard_data(sections, budget_filter))
+    if data is None:
+        # Derived stores not built yet (or the async load failed), use the sync model
+        data = load_dashboard_data(get_model(), sections)
+    return data
+
+def build_summary(data):
+    """Build the total assets, liabilities and net worth payload"""
+    total_assets, total_liabilities, net_worth = summarize_net_worth(data['accounts'], data['balances'])
+    return {
+        'total_assets': total_assets,
+        'total_liabilities': total_liabilities,
+        'net_worth': net_worth
+    }
+
+def build_accounts(data):
+    """Build the accounts payload with the current balance of each account"""
+    accounts = []
+    for account in data['accounts']:
+        account = serialize_document(dict(account))
+        account['balance'] = data['balances'].get(account['account_type'], 0)
+        accounts.append(account)
+    return accounts
+
+def build_recent_transactions(data):
+    """Build the payload of the 10 most recent transactions"""
+    return [serialize_document(dict(transaction)) for transaction in data['recent_transactions']]
+
+def build_active_budgets(data):
+    """Build the payload of active budgets with spending info"""
+    budgets = evaluate_budgets(data['budgets'], data['rollups'], active_only=True)
+    return [serialize_document(dict(budget)) for budget in budgets]
+
+DASHBOARD_BUILDERS = {
+    'summary': build_summary,
+    'accounts': build_accounts,
+    'recent-transactions': build_recent_transactions,
+    'budgets': build_active_budgets
+}
+
+def dashboard_etag(sections):
+    """Build a strong ETag from the user's data version, or None if it is unavailable"""
+    version = get_model().get_data_version()
+    if version is None:
+        return None
+    key = f"{g.user_id}:{version}:{','.join(sections)}"
+    if 'budgets' in sections:
+        # Which budgets are active depends on the day as well as the data
+        key += f":{datetime.now().strftime('%Y-%m-%d')}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def dashboard_response(sections, build):
+    """Respond with dashboard data, or 304 if the client's copy is still current"""
+    etag = dashboard_etag(sections)
+    if etag and request.if_none_match.contains(etag):
+        # Nothing changed since the client's copy, skip every query
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build(load_dashboard_data_concurrently(sections)))
+    if etag:
+        response.set_etag(etag)
+    # Per-user data: browsers may keep it but must revalidate, shared caches must not
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Authorization')
+    return response
+
+def dashboard_section_response(section):
+    """Respond with a single dashboard section"""
     if not require_auth():
         return jsonify({'error': 'Authentication required'}), 401
     
-    model = get_model()
+    return dashboard_response([section], DASHBOARD_BUILDERS[section])
+
+@main.route('/api/dashboard/bundle')
+def api_dashboard_bundle():
+    """API endpoint for several dashboard sections sharing one data load"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
     
-    accounts = model.get_accounts()
-    transactions = model.get_transactions()
-    
-    # Calculate current balances
-    balances = calculate_balances(accounts, transactions)
-    
-    # Calculate total assets, liabilities, and net worth
-    total_assets = 0
-    total_liabilities = 0
-    
-    for account_type, balance in balances.items():
-        account = next((acc for acc in accounts if acc['account_type'] == account_type), None)
-        if account:
-            if account_type == "Credit Card":
-                # For credit cards, the balance represents debt (negative value)
-                # Liability is the absolute value of the negative balance
-                if balance < 0:
-                    total_liabilities += abs(balance)
-                else:
-                    # If balance is positive, it means we've overpaid (credit)
-                    # This should count as a negative liability (asset)
-                    total_liabilities -= balance  # Subtract because it's a credit
-            else:
-                if balance >= 0:
-                    total_assets += balance
-                else:
-                    total_liabilities += abs(balance)
-    
-    net_worth = total_assets - total_liabilities
+    requested = request.args.get('sections', '')
+    sections = [section.strip() for section in requested.split(',') if section.strip()] or DASHBOARD_SECTIONS
+    unknown = [section for section in sections if section not in DASHBOARD_BUILDERS]
+    if unknown:
+        return jsonify({'error': f"Unknown dashboard sections: {', '.join(unknown)}"}), 400
     
-    return jsonify({
-        'total_assets': total_assets,
-        'total_liabilities': total_liabilities,
-        'net_worth': net_worth
+    return dashboard_response(sections, lambda data: {
+        section: DASHBOARD_BUILDERS[section](data) for section in sections
     })
 
+@main.route('/api/dashboard/summary')
+def api_dashboard_summary():
+    """API endpoint for dashboard summary data"""
+    return dashboard_section_response('summary')
+
 @main.route('/api/dashboard/accounts')
 def api_dashboard_accounts():
     """API endpoint for dashboard accounts data"""
-    if not require_auth():
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    model = get_model()
-    
-    accounts = model.get_accounts()
-    transactions = model.get_transactions()
-    
-    # Calculate current balances
-    balances = calculate_balances(accounts, transactions)
-    
-    # Add balance to each account
-    for account in accounts:
-        account['balance'] = balances.get(account['account_type'], 0)
-    
-    return jsonify(accounts)
+    return dashboard_section_response('accounts')
 
 @main.route('/api/dashboard/recent-transactions')
 def api_dashboard_recent_transactions():
     """API endpoint for recent transactions"""
-    if not require_auth():
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    model = get_model()
-    
-    # Get last 10 transactions
-    transactions = model.get_transactions()
-    
-    # Sort by date (newest first) and take last 10
-    transactions.sort(key=lambda x: x['date'], reverse=True)
-    recent_transactions = transactions[:10]
-    
-    return jsonify(recent_transactions)
+    return dashboard_section_response('recent-transactions')
 
 @main.route('/api/dashboard/budgets')
 def api_dashboard_budgets():
     """API endpoint for active budgets"""
-    if not require_auth():
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    model = get_model()
-    
-    budgets = model.get_budgets()
-    transactions = model.get_transactions()
-    
-    # Add status and spending info to each budget
-    today = datetime.now().strftime("%Y-%m-%d")
-    active_budgets = []
-    
-    for budget in budgets:
-        # Check if budget is active
-        is_active = budget["start_date"] <= today <= budget["end_date"]
-        if not is_active:
-            continue
-            
-        # Calculate spent amount for this budget period
-        spent = 0
-        for transaction in transactions:
-            if (transaction["type"] == "expense" and 
-                transaction["category"] == budget["category"] and
-                budget["start_date"] <= transaction["date"] <= budget["end_date"]):
-                spent += transaction["amount"]
-        
-        budget["spent"] = spent
-        budget["remaining"] = budget["amount"] - spent
-        budget["percentage"] = (spent / budget["amount"]) * 100 if budget["amount"] > 0 else 0
-        
-        active_budgets.append(budget)
-    
-    return jsonify(active_budgets)
+    return dashboard_section_response('budgets')
 
 @main.route('/accounts')
 def accounts():
@@ -271,12 +251,32 @@ def add_account():
             "created_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        model.create_account(account_data)
+        # Account types are unique per user, and a duplicate insert is refused
+        if model.get_account(account_type, view='balance'):
+            flash(f"Account {account_type} already exists!", "error")
+            return redirect(url_for('main.add_account'))
+        if not model.create_account(account_data):
+            flash(f"Account {account_type} could not be added.", "error")
+            return redirect(url_for('main.add_account'))
         flash(f"Account {account_type} added successfully!", "success")
         return redirect(url_for('main.accounts'))
     
     return render_template('add_account.html')
 
+def build_transaction_filter(transaction_type='', category='', account='', date_filter=None):
+    """Build the transaction filter used by the transaction list views"""
+    filter_query = dict(date_filter or {})
+    if transaction_type:
+        filter_query['type'] = transaction_type
+    if category:
+        filter_query['category'] = category
+    if account:
+        if transaction_type == 'transfer':
+            filter_query['$or'] = [{'from_account': account}, {'to_account': account}]
+        else:
+            filter_query['account'] = account
+    return filter_query
+
 @main.route('/transactions')
 def transactions():
     """View all transactions"""
@@ -286,10 +286,9 @@ def transactions():
     
     accounts = model.get_accounts()
     categories = model.get_categories()
-    transactions = model.get_transactions()
     
-    # Calculate current balances
-    balances = calculate_balances(accounts, transactions)
+    # Current balances come from the materialized balance store
+    balances = model.get_balances(accounts)
     
     # Get filter parameters
     transaction_type = request.args.get('type', '')
@@ -297,30 +296,19 @@ def transactions():
     account = request.args.get('account', '')
     
     # Build filter query
-    filter_query = {}
-    if transaction_type:
-        filter_query['type'] = transaction_type
-    if category:
-        filter_query['category'] = category
-    if account:
-        if transaction_type == 'transfer':
-            filter_query['$or'] = [{'from_account': account}, {'to_account': account}]
-        else:
-            filter_query['account'] = account
-    
-    filtered_transactions = model.get_transactions(filter_query)
+    filter_query = build_transaction_filter(transaction_type, category, account)
     
-    # Sort transactions by date (newest first)
-    filtered_transactions.sort(key=lambda x: x['date'], reverse=True)
-    
-    # Pagination
+    # Pagination, sorted by date (newest first) inside the database
     page = request.args.get('page', 1, type=int)
     per_page = 10
-    total_transactions = len(filtered_transactions)
+    total_transactions = model.count_transactions(filter_query)
     total_pages = (total_transactions + per_page - 1) // per_page
-    start_index = (page - 1) * per_page
-    end_index = start_index + per_page
-    paginated_transactions = filtered_transactions[start_index:end_index]
+    start_index = (max(page, 1) - 1) * per_page
+    paginated_transactions = model.get_transactions(filter_query,
+                                                    sort=NEWEST_FIRST,
+                                                    skip=start_index,
+                                                    limit=per_page,
+                                                    view='list')
     
     return render_template('transactions.html', 
                           transactions=paginated_transactions,
@@ -334,6 +322,196 @@ def transactions():
                           category=category,
                           account=account)
 
+@main.route('/api/transactions')
+def api_transactions():
+    """API endpoint for transaction history using keyset pagination"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    model = get_model()
+    
+    filter_query = build_transaction_filter(request.args.get('type', ''),
+                                            request.args.get('category', ''),
+                                            request.args.get('account', ''))
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    
+    after = None
+    if request.args.get('after'):
+        try:
+            after = decode_cursor(request.args['after'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    # Fetch one extra row to know whether another page exists
+    page = model.get_transactions_page(filter_query, after=after, limit=limit + 1, view='list')
+    has_more = len(page) > limit
+    page = page[:limit]
+    
+    return jsonify({
+        'transactions': [serialize_document(dict(transaction)) for transaction in page],
+        'next_cursor': encode_cursor(page[-1]) if has_more else None
+    })
+
+def get_date_range():
+    """Read optional start_date/end_date query arguments, returning (start, end, error)"""
+    start_date = request.args.get('start_date', '')
+    end_date = request.args.get('end_date', '')
+    for value in (start_date, end_date):
+        if value:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return None, None, f"Invalid date: {value}. Use YYYY-MM-DD"
+    return start_date, end_date, None
+
+@main.route('/api/transactions/export')
+def api_export_transactions():
+    """API endpoint to download transactions as CSV or NDJSON, streamed from the database"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    file_format = request.args.get('format', 'csv').lower()
+    if file_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported export format: {file_format}"}), 400
+    
+    start_date, end_date, error = get_date_range()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    model = get_model()
+    # Rows stream in date order, so range on the string date the sort and its indexes use
+    filter_query = build_transaction_filter(request.args.get('type', ''),
+                                            request.args.get('category', ''),
+                                            request.args.get('account', ''),
+                                            model.transaction_date_filter(start_date, end_date, native=False))
+    transactions = model.iter_transactions(filter_query, sort=OLDEST_FIRST, batch_size=1000, view='export')
+    content_type, extension = EXPORT_FORMATS[file_format]
+    response = current_app.response_class(
+        stream_with_context(export_transactions(transactions, file_format)),
+        mimetype=content_type
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="transactions.{extension}"'
+    return response
+
+@main.route('/api/transactions/import', methods=['POST'])
+def api_import_transactions():
+    """API endpoint to import transactions from an uploaded CSV or JSON-lines file"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    upload = request.files.get('file')
+    file_format = request.values.get('format', '').lower()
+    if not file_format:
+        filename = upload.filename if upload and upload.filename else ''
+        file_format = 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+    if file_format not in IMPORT_FORMATS:
+        return jsonify({'error': f"Unsupported import format: {file_format}"}), 400
+    
+    try:
+        column_map = parse_column_map(request.values.get('columns', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Read the upload (or the raw request body) as a stream, never all at once
+    stream = io.TextIOWrapper(upload.stream if upload else request.stream, encoding='utf-8-sig', newline='')
+    report = import_transactions(
+        get_model(), stream, file_format, column_map,
+        batch_size=min(max(request.values.get('batch_size', 1000, type=int), 1), 5000),
+        date_format=request.values.get('date_format', '%Y-%m-%d'),
+        add_categories=request.values.get('add_categories', 'false').lower() == 'true'
+    )
+    return jsonify(report)
+
+def report_response(report):
+    """Respond with an income/expense report over the requested date range"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    start_date, end_date, error = get_date_range()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    result = get_model().get_report(report, start_date, end_date)
+    if result is None:
+        return jsonify({'error': 'Report could not be generated'}), 500
+    
+    return jsonify({
+        'start_date': start_date or None,
+        'end_date': end_date or None,
+        **result
+    })
+
+@main.route('/api/reports/monthly')
+def api_monthly_report():
+    """API endpoint for income, expense and net per month"""
+    return report_response('monthly')
+
+@main.route('/api/reports/by-category')
+def api_category_report():
+    """API endpoint for income, expense and net per category"""
+    return report_response('by-category')
+
+@main.route('/api/balances/as-of')
+def api_balance_as_of():
+    """API endpoint for an account's balance at the end of a given day"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    account_type = request.args.get('account', '')
+    if not account_type:
+        return jsonify({'error': 'account is required'}), 400
+    day = request.args.get('date', '') or datetime.now().strftime('%Y-%m-%d')
+    try:
+        datetime.strptime(day, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': f"Invalid date: {day}. Use YYYY-MM-DD"}), 400
+    
+    model = get_model()
+    if not model.get_account(account_type, view='balance'):
+        return jsonify({'error': f"Account not found: {account_type}"}), 404
+    
+    balance = model.get_balance_as_of(account_type, day)
+    if balance is None:
+        return jsonify({'error': 'Balance could not be calculated'}), 500
+    
+    return jsonify(balance)
+
+# Longest series a single request may ask for (about ten years of days)
+MAX_HISTORY_POINTS = 3660
+
+@main.route('/api/net-worth/history')
+def api_net_worth_history():
+    """API endpoint for assets, liabilities and net worth over time"""
+    if not require_auth():
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    start_date, end_date, error = get_date_range()
+    if error:
+        return jsonify({'error': error}), 400
+    frequency = request.args.get('frequency', 'monthly')
+    if frequency not in FREQUENCIES:
+        return jsonify({'error': f"Unsupported frequency: {frequency}. Use {', '.join(FREQUENCIES)}"}), 400
+    
+    # Default to the last twelve months up to today
+    end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+    start_date = start_date or (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=365)).strftime('%Y-%m-%d')
+    days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days
+    if days < 0:
+        return jsonify({'error': 'start_date must not be after end_date'}), 400
+    if frequency == 'daily' and days >= MAX_HISTORY_POINTS:
+        return jsonify({'error': f"Daily history is limited to {MAX_HISTORY_POINTS} days"}), 400
+    
+    history = get_model().get_net_worth_history(start_date, end_date, frequency)
+    if history is None:
+        return jsonify({'error': 'Net worth history could not be generated'}), 500
+    
+    return jsonify({
+        'start_date': start_date,
+        'end_date': end_date,
+        'frequency': frequency,
+        'history': history
+    })
+
 @main.route('/transactions/add', methods=['GET', 'POST'])
 def add_transaction():
     """Add a new transaction"""
@@ -344,63 +522,17 @@ def add_transaction():
     accounts = model.get_accounts()
     categories = model.get_categories()
     
-    # Calculate current balances
-    transactions = model.get_transactions()
-    balances = calculate_balances(accounts, transactions)
+    # Current balances come from the materialized balance store
+    balances = model.get_balances(accounts)
     
     if request.method == 'POST':
-        transaction_type = request.form.get('transaction_type', '')
-        
-        if not transaction_type:
-            flash("Transaction type is required!", "error")
-            return redirect(url_for('main.add_transaction'))
-        
-        transaction_data = {
-            "type": transaction_type,
-            "date": request.form.get('date', ''),
-            "amount": float(request.form.get('amount', 0)),
-            "description": request.form.get('description', ''),
-            "added_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        if transaction_type == "income":
-            transaction_data["account"] = request.form.get('account', '')
-            transaction_data["category"] = request.form.get('category', '')
-        elif transaction_type == "expense":
-            transaction_data["account"] = request.form.get('account', '')
-            transaction_data["category"] = request.form.get('category', '')
-        elif transaction_type == "transfer":
-            transaction_data["from_account"] = request.form.get('from_account', '')
-            transaction_data["to_account"] = request.form.get('to_account', '')
-            transaction_data["category"] = request.form.get('category', '')
-        
-        # Validate required fields
-        if not transaction_data["date"]:
-            flash("Date is required!", "error")
+        fields = request.form.to_dict()
+        fields['type'] = request.form.get('transaction_type', '')
+        transaction_data, error = build_transaction(fields)
+        if error:
+            flash(error, "error")
             return redirect(url_for('main.add_transaction'))
         
-        if transaction_data["amount"] <= 0:
-            flash("Amount must be greater than zero!", "error")
-            return redirect(url_for('main.add_transaction'))
-        
-        if transaction_type in ["income", "expense"]:
-            if not transaction_data["account"]:
-                flash("Account is required for income/expense transactions!", "error")
-                return redirect(url_for('main.add_transaction'))
-            if not transaction_data["category"]:
-                flash("Category is required for income/expense transactions!", "error")
-                return redirect(url_for('main.add_transaction'))
-        elif transaction_type == "transfer":
-            if not transaction_data["from_account"]:
-                flash("From account is required for transfer transactions!", "error")
-                return redirect(url_for('main.add_transaction'))
-            if not transaction_data["to_account"]:
-                flash("To account is required for transfer transactions!", "error")
-                return redirect(url_for('main.add_transaction'))
-            if not transaction_data["category"]:
-                flash("Category is required for transfer transactions!", "error")
-                return redirect(url_for('main.add_transaction'))
-        
         model.create_transaction(transaction_data)
         flash("Transaction added successfully!", "success")
         return redirect(url_for('main.transactions'))
@@ -417,27 +549,12 @@ def budgets():
     # This prevents the flash of login page issue
     model = get_model()
     
-    budgets = model.get_budgets()
-    transactions = model.get_transactions()
+    budgets = model.get_budgets(view='list')
+    # Daily spend rollups stand in for the raw expense transactions
+    rollups = model.get_budget_rollups(budgets)
     
     # Add status and spending info to each budget
-    today = datetime.now().strftime("%Y-%m-%d")
-    for budget in budgets:
-        # Check if budget is active
-        is_active = budget["start_date"] <= today <= budget["end_date"]
-        budget["status"] = "ACTIVE" if is_active else "INACTIVE"
-        
-        # Calculate spent amount for this budget period
-        spent = 0
-        for transaction in transactions:
-            if (transaction["type"] == "expense" and 
-                transaction["category"] == budget["category"] and
-                budget["start_date"] <= transaction["date"] <= budget["end_date"]):
-                spent += transaction["amount"]
-        
-        budget["spent"] = spent
-        budget["remaining"] = budget["amount"] - spent
-        budget["percentage"] = (spent / budget["amount"]) * 100 if budget["amount"] > 0 else 0
+    budgets = evaluate_budgets(budgets, rollups)
     
     return render_template('budgets.html', budgets=budgets)
 
@@ -508,7 +625,8 @@ def manage_categories():
     # This prevents the flash of login page issue
     model = get_model()
     
-    categories = model.get_categories()
+    # Checked against the database, the cached copy may predate another worker's change
+    categories = model.get_categories(fresh=request.method == 'POST')
     
     if request.method == 'POST':
         category_type = request.form['category_type']
@@ -518,27 +636,40 @@ def manage_categories():
         if category_type in categories:
             if action == 'add':
                 if category_name not in categories[category_type]:
-                    categories[category_type].append(category_name)
-                    model.update_categories(categories)
+                    model.add_categories(category_type, [category_name])
                     flash(f"Category '{category_name}' added to {category_type}!", "success")
             elif action == 'remove':
                 if category_name in categories[category_type]:
-                    categories[category_type].remove(category_name)
-                    model.update_categories(categories)
+                    model.remove_category(category_type, category_name)
                     flash(f"Category '{category_name}' removed from {category_type}!", "success")
         
         return redirect(url_for('main.categories'))
     
     return render_template('manage_categories.html', categories=categories)
 
+def cached_info_page(model):
+    """Get the rendered info page from the worker's cache, rendering it if it changed"""
+    return info_page.get(model.get_info_version,
+                         lambda: render_template('info.html', info=model.get_info()))
+
 @main.route('/info')
 def info():
     """View information page - info is common for all users"""
     # Use FinanceModel without user context for info page
     model = FinanceModel()
     
-    info_data = model.get_info()
-    return render_template('info.html', info=info_data)
+    if session.get('_flashes'):
+        # Pending flash messages are per visitor, so render this one live
+        return render_template('info.html', info=model.get_info())
+    
+    page = cached_info_page(model)
+    response = make_response(page['html'])
+    response.set_etag(page['etag'])
+    response.last_modified = page['last_modified']
+    # Let browsers keep the page but revalidate it, which is answered with a 304
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @main.route('/login')
 def login_page():
@@ -0,0 +1,40 @@
+"""
+Production launcher for PaisaTrack using gunicorn
+
+Usage:
+    python serve.py [--bind 127.0.0.1:5000] [--workers N] [--threads N]
+
+Settings default to gunicorn.conf.py (which reads WEB_* environment
+variables); command line options override them.
+"""
+import argparse
+import sys
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve PaisaTrack with gunicorn")
+    parser.add_argument("--bind", help="Address to listen on, e.g. 0.0.0.0:8000")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--threads", type=int, help="Threads per worker process")
+    args = parser.parse_args(argv)
+
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        print("gunicorn is not installed (it is not available on Windows); use 'python app.py' instead")
+        return 1
+
+    gunicorn_args = ["gunicorn", "--config", "gunicorn.conf.py"]
+    if args.bind:
+        gunicorn_args += ["--bind", args.bind]
+    if args.workers:
+        gunicorn_args += ["--workers", str(args.workers)]
+    if args.threads:
+        gunicorn_args += ["--threads", str(args.threads)]
+    gunicorn_args.append("wsgi:app")
+
+    sys.argv = gunicorn_args
+    WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]").run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Test script for net worth checkpoints and balance snapshots against a full replay
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mock_mongo
+from utils.balances import calculate_balances, summarize_net_worth
+from utils.ledger_engine import period_ends, to_date
+
+ACCOUNTS = [
+    {"account_type": "Bank Account", "initial_amount": 1000},
+    {"account_type": "Cash", "initial_amount": 50},
+    {"account_type": "Credit Card", "initial_amount": 0},
+]
+
+def make_transactions(count=400):
+    """Random transactions from 2022 to 2025, including transfers to an account that no longer exists"""
+    random.seed(23)
+    transactions = []
+    for _ in range(count):
+        transaction = {
+            "type": random.choice(["income", "expense", "transfer"]),
+            "date": f"202{random.randint(2, 5)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "amount": round(random.uniform(1, 300), 2),
+            "category": "Misc"
+        }
+        if transaction["type"] == "transfer":
+            transaction["from_account"] = random.choice(["Bank Account", "Cash"])
+            transaction["to_account"] = random.choice(["Credit Card", "Cash", "Old Wallet"])
+        else:
+            transaction["account"] = random.choice(["Bank Account", "Cash", "Credit Card"])
+        transactions.append(transaction)
+    return transactions
+
+def setup_user():
+    model = mock_mongo.MockFinanceModel("user1")
+    for account in ACCOUNTS:
+        model.create_account(dict(account))
+    model.insert_transactions(make_transactions())
+    return model
+
+def replay(db, day):
+    """Balances at the end of a day from every transaction, the slow way"""
+    accounts = list(db.accounts.find({"user_id": "user1"}))
+    transactions = [t for t in db.transactions.find({"user_id": "user1"}) if t["date"] <= day]
+    return accounts, calculate_balances(accounts, transactions)
+
+def check_history(model, db, start_date, end_date, frequency):
+    """Compare each point of the net worth series with a full replay to that day"""
+    history = model.get_net_worth_history(start_date, end_date, frequency)
+    points = period_ends(start_date, end_date, frequency).tolist()
+    assert len(history) == len(points), (len(history), len(points))
+    for point, day in zip(history, points):
+        net_worth = summarize_net_worth(*replay(db, to_date(day)))[2]
+        assert abs(point["net_worth"] - net_worth) < 1e-6, (to_date(day), point, net_worth)
+
+def check_as_of(model, db, account_type, day):
+    """Compare a balance as of a day with a full replay to that day"""
+    result = model.get_balance_as_of(account_type, day)
+    expected = replay(db, day)[1][account_type]
+    assert abs(result["balance"] - expected) < 1e-6, (account_type, day, result, expected)
+    return result
+
+def test_history_matches_replay():
+    """Test that checkpointed net worth history matches a replay through back-dated writes"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+    with mock_mongo.mock_database() as db:
+        model = setup_user()
+        check_history(model, db, "2023-03-10", "2024-02-15", "monthly")
+        assert db.balance_checkpoints.count_documents({}) > 0
+        # Later requests start from the checkpoints the first one stored
+        check_history(model, db, "2024-06-01", "2024-07-15", "daily")
+        check_history(model, db, "2022-01-01", "2025-12-31", "weekly")
+        assert db.balance_checkpoints.find_one(sort=[("date", -1)])["date"] >= "2025-11-30"
+
+        # A back-dated add drops the checkpoints from its date on, and only those
+        model.create_transaction({"type": "expense", "account": "Cash", "category": "Misc",
+                                  "amount": 500, "date": "2023-06-15"})
+        assert db.balance_checkpoints.count_documents({"date": {"$gte": "2023-06-15"}}) == 0
+        assert db.balance_checkpoints.count_documents({"date": {"$lt": "2023-06-15"}}) > 0
+        check_history(model, db, "2024-01-01", "2024-12-31", "monthly")
+
+        # Moving an old transaction forward invalidates from its old date
+        old = db.transactions.find_one({"date": {"$lt": "2022-03-01"}})
+        model.update_transaction(old["_id"], {"amount": 9999, "date": "2025-01-01"})
+        assert db.balance_checkpoints.count_documents({"date": {"$gte": old["date"]}}) == 0
+        check_history(model, db, "2022-01-01", "2025-12-31", "monthly")
+
+        model.delete_transaction(old["_id"])
+        check_history(model, db, "2024-12-15", "2025-03-01", "daily")
+
+        # Opening amounts are applied on top of checkpoints, so changing one needs no invalidation
+        model.update_account("Cash", {"initial_amount": 75})
+        check_history(model, db, "2022-05-01", "2025-12-31", "monthly")
+    print("✓ Net worth history matches a full replay")
+
+def test_history_race_drops_checkpoints():
+    """Test that checkpoints saved while a write landed are dropped instead of kept wrong"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+
+    class RacingModel(mock_mongo.MockFinanceModel):
+        raced = False
+
+        def get_ledger(self, filter_query=None):
+            ledger = super().get_ledger(filter_query)
+            if not RacingModel.raced:
+                RacingModel.raced = True
+                mock_mongo.MockFinanceModel("user1").create_transaction(
+                    {"type": "income", "account": "Bank Account", "category": "Misc",
+                     "amount": 1234, "date": "2022-02-10"})
+            return ledger
+
+    with mock_mongo.mock_database() as db:
+        setup_user()
+        RacingModel("user1").get_net_worth_history("2022-01-01", "2024-12-31", "monthly")
+        assert db.balance_checkpoints.count_documents({}) == 0
+        check_history(mock_mongo.MockFinanceModel("user1"), db, "2022-01-01", "2024-12-31", "monthly")
+    print("✓ Checkpoints raced by a write are dropped")
+
+def test_balance_as_of_matches_replay():
+    """Test that snapshot-based balances match a replay through back-dated writes"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+    days = ["2021-12-31", "2022-01-01", "2023-03-15", "2023-03-31", "2024-07-04", "2026-01-01"]
+    with mock_mongo.mock_database() as db:
+        model = setup_user()
+        check_as_of(model, db, "Cash", "2023-03-31")
+        assert model.build_account_snapshots(every=25) > 0
+        assert model.build_account_snapshots(every=25) == 0
+        for account in ACCOUNTS:
+            for day in days:
+                check_as_of(model, db, account["account_type"], day)
+        result = check_as_of(model, db, "Cash", "2024-07-04")
+        assert result["snapshot_date"] and result["transactions_replayed"] < 25
+
+        # A back-dated transfer drops the snapshots of the accounts it touches from its date on
+        counts = {account["account_type"]: db.account_snapshots.count_documents({"account_type": account["account_type"]})
+                  for account in ACCOUNTS}
+        model.create_transaction({"type": "transfer", "from_account": "Cash", "to_account": "Credit Card",
+                                  "category": "Misc", "amount": 77, "date": "2024-02-10"})
+        assert db.account_snapshots.count_documents({"account_type": "Bank Account"}) == counts["Bank Account"]
+        for account_type in ("Cash", "Credit Card"):
+            assert db.account_snapshots.count_documents({"account_type": account_type,
+                                                         "date": {"$gte": "2024-02-10"}}) == 0
+        check_as_of(model, db, "Cash", "2024-12-31")
+        check_as_of(model, db, "Credit Card", "2024-02-10")
+        assert model.build_account_snapshots(every=25) > 0
+        check_as_of(model, db, "Cash", "2024-12-31")
+
+        # An edit moving a transaction forward invalidates from its old date
+        old = db.transactions.find_one({"account": "Bank Account", "date": {"$lt": "2022-06-01"}})
+        model.update_transaction(old["_id"], {"date": "2025-05-05"})
+        assert db.account_snapshots.count_documents({"account_type": "Bank Account",
+                                                     "date": {"$gte": old["date"]}}) == 0
+        check_as_of(model, db, "Bank Account", "2023-01-01")
+        model.build_account_snapshots(every=25)
+        check_as_of(model, db, "Bank Account", "2025-05-04")
+        check_as_of(model, db, "Bank Account", "2025-05-05")
+
+        model.delete_transaction(old["_id"])
+        for day in days:
+            check_as_of(model, db, "Bank Account", day)
+        assert model.get_balance_as_of("Old Wallet", "2024-01-01") is None
+    print("✓ Balances as of a date match a full replay")
+
+if __name__ == "__main__":
+    test_history_matches_replay()
+    test_history_race_drops_checkpoints()
+    test_balance_as_of_matches_replay()
@@ -0,0 +1,77 @@
+"""
+Test script for the budget spend engine
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.budgets import BudgetSpendIndex, evaluate_budgets
+
+TRANSACTIONS = [
+    {"type": "expense", "category": "Food", "amount": 100, "date": "2023-11-01"},
+    {"type": "expense", "category": "Food", "amount": 250, "date": "2023-11-15"},
+    {"type": "expense", "category": "Food", "amount": 50, "date": "2023-11-30"},
+    {"type": "expense", "category": "Food", "amount": 999, "date": "2023-12-01"},
+    {"type": "income", "category": "Food", "amount": 5000, "date": "2023-11-10"},
+    {"type": "expense", "category": "Rent", "amount": 20000, "date": "2023-11-02"},
+]
+
+def test_spent_is_inclusive():
+    """Test that both ends of the budget period are included"""
+    index = BudgetSpendIndex(TRANSACTIONS)
+    assert index.spent("Food", "2023-11-01", "2023-11-30") == 400
+    assert index.spent("Food", "2023-11-02", "2023-11-29") == 250
+    assert index.spent("Food", "2023-12-02", "2023-12-31") == 0
+    assert index.spent("Travel", "2023-11-01", "2023-11-30") == 0
+    assert index.spent("Food", "2023-11-30", "2023-11-01") == 0
+    print("✓ Budget periods are inclusive")
+
+def test_evaluate_budgets():
+    """Test status and spending info added to budgets"""
+    budgets = [
+        {"category": "Food", "amount": 1000, "start_date": "2023-11-01", "end_date": "2023-11-30"},
+        {"category": "Rent", "amount": 0, "start_date": "2023-11-01", "end_date": "2023-11-30"},
+        {"category": "Food", "amount": 1000, "start_date": "2023-12-01", "end_date": "2023-12-31"},
+    ]
+    evaluated = evaluate_budgets(budgets, TRANSACTIONS, today="2023-11-20")
+    assert [budget["status"] for budget in evaluated] == ["ACTIVE", "ACTIVE", "INACTIVE"]
+    assert evaluated[0]["spent"] == 400
+    assert evaluated[0]["remaining"] == 600
+    assert evaluated[0]["percentage"] == 40
+    assert evaluated[1]["percentage"] == 0
+
+    active = evaluate_budgets(budgets, TRANSACTIONS, today="2023-12-05", active_only=True)
+    assert len(active) == 1 and active[0]["spent"] == 999
+    print("✓ Budgets evaluated correctly")
+
+def test_matches_nested_loops():
+    """Test the index against the original budgets x transactions loop"""
+    random.seed(7)
+    categories = ["Food", "Rent", "Travel"]
+    transactions = [
+        {
+            "type": random.choice(["expense", "income"]),
+            "category": random.choice(categories),
+            "amount": random.randint(1, 1000),
+            "date": f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+        }
+        for _ in range(2000)
+    ]
+    index = BudgetSpendIndex(transactions)
+    for _ in range(200):
+        start = f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+        end = f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+        category = random.choice(categories)
+        expected = sum(
+            transaction["amount"] for transaction in transactions
+            if transaction["type"] == "expense" and transaction["category"] == category
+            and start <= transaction["date"] <= end
+        )
+        assert index.spent(category, start, end) == expected
+    print("✓ Index matches the nested loop results")
+
+if __name__ == "__main__":
+    test_spent_is_inclusive()
+    test_evaluate_budgets()
+    test_matches_nested_loops()
@@ -0,0 +1,91 @@
+"""
+Test script for the in-process caches and JSON defaults
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.cache import TTLCache
+from utils.defaults import DEFAULT_CATEGORIES, default_categories
+from utils.info_page import InfoPageCache
+
+def test_ttl_expiry():
+    """Test that entries expire after the TTL"""
+    cache = TTLCache(ttl=10)
+    cache.set("user1", {"income": ["Salary"]}, now=100)
+    assert cache.get("user1", now=105) == {"income": ["Salary"]}
+    assert cache.get("user1", now=110) is None
+    assert cache.stats()["size"] == 0
+    print("✓ Entries expire after the TTL")
+
+def test_returns_copies():
+    """Test that mutating a cached value does not change the cache"""
+    cache = TTLCache(ttl=10)
+    categories = {"expense": ["Food"]}
+    cache.set("user1", categories, now=100)
+    categories["expense"].append("Rent")
+    cached = cache.get("user1", now=101)
+    cached["expense"].append("Travel")
+    assert cache.get("user1", now=102) == {"expense": ["Food"]}
+    print("✓ Cached values are copied")
+
+def test_invalidate_and_eviction():
+    """Test invalidation and least recently used eviction"""
+    cache = TTLCache(ttl=10, max_size=2)
+    cache.set("a", 1, now=100)
+    cache.set("b", 2, now=100)
+    cache.get("a", now=100)
+    cache.set("c", 3, now=100)
+    assert cache.get("b", now=100) is None
+    assert cache.get("a", now=100) == 1
+    cache.invalidate("a")
+    assert cache.get("a", now=100) is None
+    print("✓ Invalidation and eviction work")
+
+def test_default_categories():
+    """Test that the defaults are frozen and handed out as mutable copies"""
+    categories = default_categories()
+    assert "Food" in categories["expense"]
+    categories["expense"].append("Custom")
+    assert "Custom" not in default_categories()["expense"]
+    try:
+        DEFAULT_CATEGORIES["expense"] = ()
+        assert False, "defaults should be read-only"
+    except TypeError:
+        pass
+    print("✓ Default categories are immutable")
+
+def test_info_page_versions():
+    """Test that the info page is re-rendered only when its version changes"""
+    cache = InfoPageCache(ttl=30)
+    state = {"version": 1, "renders": 0, "checks": 0}
+
+    def load_version():
+        state["checks"] += 1
+        return state["version"], None
+
+    def render():
+        state["renders"] += 1
+        return f"<h1>v{state['version']}</h1>"
+
+    first = cache.get(load_version, render, now=100)
+    assert cache.get(load_version, render, now=110) is first
+    assert state["checks"] == 1
+
+    # After the TTL the version is checked but an unchanged page is kept
+    assert cache.get(load_version, render, now=140)["etag"] == first["etag"]
+    assert state["renders"] == 1
+
+    state["version"] = 2
+    cache.invalidate()
+    second = cache.get(load_version, render, now=141)
+    assert second["html"] == "<h1>v2</h1>" and second["etag"] != first["etag"]
+    assert state["renders"] == 2
+    print("✓ Info page follows its version")
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_returns_copies()
+    test_invalidate_and_eviction()
+    test_default_categories()
+    test_info_page_versions()
@@ -0,0 +1,115 @@
+"""
+Test script for the dashboard and budget pages without a signed-in user
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('AUTO_CREATE_INDEXES', 'false')
+
+import mock_mongo
+from app import create_app
+from flask import current_app
+from models.finance import FinanceModel
+from utils.balances import calculate_balances, sum_deltas
+
+ACCOUNTS = [
+    {"account_type": "Bank Account", "initial_amount": 100000},
+    {"account_type": "Credit Card", "initial_amount": -25000},
+]
+
+TRANSACTIONS = [
+    {"type": "income", "account": "Bank Account", "category": "Salary", "amount": 75000, "date": "2023-11-01"},
+    {"type": "transfer", "from_account": "Bank Account", "to_account": "Credit Card",
+     "category": "Credit Card Payment", "amount": 25000, "date": "2023-11-03"},
+]
+
+class NoUserModel(FinanceModel):
+    """FinanceModel without a user whose database reads return fixed data"""
+
+    def __init__(self):
+        self.user_id = None
+        self.store_reads = 0
+
+    def get_accounts(self, view=None, projection=None):
+        return [dict(account) for account in ACCOUNTS]
+
+    def get_transactions(self, filter_query=None, sort=None, skip=0, limit=0, projection=None, view=None):
+        return [dict(transaction) for transaction in TRANSACTIONS]
+
+    def get_account_totals(self):
+        return {account: {"net": net} for account, net in sum_deltas(TRANSACTIONS).items()}
+
+    def _get_ledger_state(self):
+        # The materialized store is per user, it must not be consulted here
+        self.store_reads += 1
+        return {}
+
+def test_balances_without_user():
+    """Test that balances without a user come from the transactions, not the store"""
+    model = NoUserModel()
+    assert model.get_balances(ACCOUNTS) == calculate_balances(ACCOUNTS, TRANSACTIONS)
+    assert model.store_reads == 0
+    print("✓ Balances computed without a user")
+
+def test_dashboard_without_user():
+    """Test that the dashboard page shows real balances when no user is signed in"""
+    app = create_app()
+    routes_main = sys.modules['routes.main']
+    rendered = {}
+
+    def render_template(template, **context):
+        rendered.update(context)
+        return ""
+
+    original_get_model, original_render = routes_main.get_model, routes_main.render_template
+    routes_main.get_model = NoUserModel
+    routes_main.render_template = render_template
+    try:
+        response = app.test_client().get('/dashboard')
+    finally:
+        routes_main.get_model, routes_main.render_template = original_get_model, original_render
+
+    assert response.status_code == 200
+    assert rendered["balances"] == {"Bank Account": 150000, "Credit Card": 0}
+    assert rendered["net_worth"] == 150000
+    print("✓ Dashboard shows balances without a user")
+
+def test_budgets_without_user():
+    """Test that the budgets page sums spend from the transactions when no user is signed in"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+    with mock_mongo.mock_database() as db:
+        db.budgets.insert_one({"category": "Food", "amount": 1000, "period": "monthly",
+                               "start_date": "2024-01-01", "end_date": "2024-01-31"})
+        db.transactions.insert_many([
+            {"type": "expense", "account": "Cash", "category": "Food", "amount": 120, "date": "2024-01-05"},
+            {"type": "expense", "account": "Cash", "category": "Food", "amount": 180, "date": "2024-01-05"},
+            {"type": "expense", "account": "Cash", "category": "Food", "amount": 50, "date": "2024-02-01"},
+            {"type": "expense", "account": "Cash", "category": "Rent", "amount": 900, "date": "2024-01-10"},
+            {"type": "expense", "account": "Cash", "category": "Food", "amount": 70, "date": "2024-01-06",
+             "user_id": "someone-else"},
+        ])
+        routes_main = sys.modules['routes.main']
+        rendered = {}
+
+        def render_template(template, **context):
+            rendered.update(context)
+            return ""
+
+        original_render = routes_main.render_template
+        routes_main.render_template = render_template
+        try:
+            response = current_app.test_client().get('/budgets')
+        finally:
+            routes_main.render_template = original_render
+
+    assert response.status_code == 200
+    [budget] = rendered["budgets"]
+    assert budget["spent"] == 300 and budget["remaining"] == 700
+    print("✓ Budgets page shows spend without a user")
+
+if __name__ == "__main__":
+    test_balances_without_user()
+    test_dashboard_without_user()
+    test_budgets_without_user()
@@ -0,0 +1,40 @@
+"""
+Test script for native date fields
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+from utils.dates import add_native_dates, date_range_query, hidden_fields, native_date_fields
+
+def test_native_fields_added():
+    """Test that string dates get a native copy and a schema version"""
+    transaction = add_native_dates("transactions", {"date": "2023-11-05", "added_date": "2023-11-05 09:30:00"})
+    assert transaction["date_at"] == datetime(2023, 11, 5)
+    assert transaction["added_at"] == datetime(2023, 11, 5, 9, 30)
+    assert transaction["schema_version"] == 2
+
+    # Updates only touch the native fields of strings being changed, and never mark the document migrated
+    assert native_date_fields("budgets", {"end_date": "2023-12-31"}, partial=True) == {"end_at": datetime(2023, 12, 31)}
+    assert native_date_fields("budgets", {"amount": 100}, partial=True) == {}
+
+    # A date that does not parse keeps the document pending for the migration
+    assert native_date_fields("transactions", {"date": "not a date", "added_date": "2023-11-05 09:30:00"}) == \
+        {"date_at": None, "added_at": datetime(2023, 11, 5, 9, 30), "schema_version": None}
+    assert native_date_fields("transactions", {"date": "05/11/2023"}, partial=True)["schema_version"] is None
+    print("✓ Native date fields added")
+
+def test_range_queries():
+    """Test native and string range filters"""
+    assert date_range_query("2023-01-01", "2023-01-31") == \
+        {"date_at": {"$gte": datetime(2023, 1, 1), "$lte": datetime(2023, 1, 31)}}
+    assert date_range_query("2023-01-01", None, native=False) == {"date": {"$gte": "2023-01-01"}}
+    assert date_range_query() == {}
+    assert hidden_fields("transactions") == ["date_at", "added_at", "schema_version"]
+    assert hidden_fields("accounts") == []
+    print("✓ Range queries built correctly")
+
+if __name__ == "__main__":
+    test_native_fields_added()
+    test_range_queries()
@@ -0,0 +1,115 @@
+"""
+Test script for transaction validation, bulk import and export
+"""
+import sys
+import os
+import io
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.validation import build_transaction
+from utils.importer import import_transactions, parse_column_map
+from utils.export import export_transactions
+
+class FakeModel:
+    """Stands in for FinanceModel, recording inserted batches"""
+
+    def __init__(self):
+        self.batches = []
+        self.added_categories = {}
+
+    def get_accounts(self, view=None):
+        return [{"account_type": "Bank Account"}, {"account_type": "Cash"}]
+
+    def get_categories(self, fresh=False):
+        return {"income": ["Salary"], "expense": ["Food", "Rent"], "transfer": ["Cash to Bank"]}
+
+    def insert_transactions(self, transactions):
+        self.batches.append(list(transactions))
+        return len(transactions), []
+
+    def add_categories(self, category_type, names):
+        self.added_categories.setdefault(category_type, []).extend(names)
+
+def test_build_transaction():
+    """Test the rules shared by the form and the importer"""
+    transaction, error = build_transaction({"type": "expense", "date": "2023-11-05", "amount": "1,250.50",
+                                            "account": "Cash", "category": "Food"})
+    assert error is None
+    assert transaction["amount"] == 1250.5 and transaction["date"] == "2023-11-05"
+
+    assert build_transaction({"type": "", "date": "2023-11-05"})[1] == "Transaction type is required!"
+    assert build_transaction({"type": "expense", "date": "", "amount": "5"})[1] == "Date is required!"
+    assert build_transaction({"type": "expense", "date": "2023-11-05", "amount": "0",
+                              "account": "Cash", "category": "Food"})[1] == "Amount must be greater than zero!"
+    assert build_transaction({"type": "transfer", "date": "2023-11-05", "amount": "5",
+                              "from_account": "Cash", "category": "Cash to Bank"})[1] == \
+        "To account is required for transfer transactions!"
+
+    transaction, error = build_transaction({"type": "income", "date": "05/11/2023", "amount": 10,
+                                            "account": "Cash", "category": "Salary"}, date_format="%d/%m/%Y")
+    assert transaction["date"] == "2023-11-05"
+    print("✓ Transactions validated correctly")
+
+def test_csv_import():
+    """Test batching, name mapping and per-row errors"""
+    csv_data = (
+        "Txn Date,Type,Amount,Account,Category,Description\n"
+        "2023-11-01,expense,100,cash,food,Lunch\n"
+        "2023-11-02,expense,abc,Cash,Food,Bad amount\n"
+        "2023-11-03,income,5000,Bank Account,Salary,\n"
+        "\n"
+        "2023-11-04,expense,20,Wallet,Food,Unknown account\n"
+        "2023-11-05,expense,30,Cash,Pets,Unknown category\n"
+        "2023-11-06,expense,40,Cash,Rent,\n"
+    )
+    model = FakeModel()
+    report = import_transactions(model, io.StringIO(csv_data), "csv", parse_column_map("Txn Date=date"),
+                                 batch_size=2)
+    assert report["rows"] == 6 and report["imported"] == 3 and report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [3, 6, 7]
+    assert [len(batch) for batch in model.batches] == [2, 1]
+    assert model.batches[0][0]["account"] == "Cash" and model.batches[0][0]["category"] == "Food"
+    print("✓ CSV rows imported in batches")
+
+def test_jsonl_import_adds_categories():
+    """Test JSON lines and adding unknown categories"""
+    jsonl_data = (
+        '{"type": "expense", "date": "2023-11-01", "amount": 12.5, "account": "Cash", "category": "Pets"}\n'
+        'not json\n'
+        '{"type": "transfer", "date": "2023-11-02", "amount": 500, "from_account": "Cash", '
+        '"to_account": "bank account", "category": "Cash to Bank"}\n'
+    )
+    model = FakeModel()
+    report = import_transactions(model, io.StringIO(jsonl_data), "jsonl", add_categories=True)
+    assert report["imported"] == 2 and report["errors"][0]["line"] == 2
+    assert model.batches[0][1]["to_account"] == "Bank Account"
+    # Only the new name is sent, as an addition to the one list
+    assert model.added_categories == {"expense": ["Pets"]}
+    print("✓ JSON lines imported")
+
+def test_export_round_trip():
+    """Test that an export can be imported again in either format"""
+    transactions = [
+        {"_id": index, "type": "expense", "date": f"2023-11-{index % 28 + 1:02d}", "amount": index + 0.5,
+         "account": "Cash", "category": "Food", "description": f'Lunch, "table" {index}'}
+        for index in range(1203)
+    ]
+    transactions.append({"_id": "t", "type": "transfer", "date": "2023-12-01", "amount": 10,
+                         "from_account": "Cash", "to_account": "Bank Account", "category": "Cash to Bank"})
+    for file_format in ("csv", "ndjson"):
+        chunks = list(export_transactions(iter(transactions), file_format))
+        assert len(chunks) > 1
+        model = FakeModel()
+        report = import_transactions(model, io.StringIO("".join(chunks)),
+                                     "csv" if file_format == "csv" else "jsonl", batch_size=5000)
+        assert report["imported"] == len(transactions), report["errors"]
+        imported = model.batches[0]
+        assert imported[7]["description"] == 'Lunch, "table" 7' and imported[7]["amount"] == 7.5
+        assert imported[-1]["to_account"] == "Bank Account"
+    print("✓ Exports import again unchanged")
+
+if __name__ == "__main__":
+    test_build_transaction()
+    test_csv_import()
+    test_jsonl_import_adds_categories()
+    test_export_round_trip()
@@ -0,0 +1,51 @@
+"""
+Test script for the declared MongoDB indexes
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from itertools import product
+from utils.indexes import INDEXES
+from utils.pagination import keyset_after
+
+PAGE_ORDER = [("date", -1), ("_id", -1)]
+
+def sort_indexes(equality_fields):
+    """Indexes that can return matching transactions in page order without a SORT stage
+
+    The keys between user_id and the page order must all be equality
+    matches, so the index walks them with point bounds. Other filters are
+    checked on the fetched documents.
+    """
+    found = []
+    for index in INDEXES["transactions"]:
+        keys = list(index.document["key"].items())
+        if keys[0] != ("user_id", 1) or keys[-2:] != PAGE_ORDER:
+            continue
+        prefix = {field for field, _ in keys[1:-2]}
+        if prefix <= equality_fields and (prefix or not equality_fields):
+            found.append(index.document["name"])
+    return found
+
+def test_every_filter_has_a_sorted_index():
+    """Test each filter the transactions page builds against the page order"""
+    for transaction_type, category, account in product(["", "expense"], ["", "Food"], ["", "Cash"]):
+        fields = {field for field, value in
+                  (("type", transaction_type), ("category", category), ("account", account)) if value}
+        assert sort_indexes(fields), f"No index serves {sorted(fields)} in page order"
+
+    # Transfers filtered by account match from_account or to_account, one index per branch
+    assert sort_indexes({"from_account"}) and sort_indexes({"to_account"})
+    print("✓ Every transaction filter has an index in page order")
+
+def test_keyset_uses_page_order():
+    """Test that the keyset condition follows the (date, _id) page order"""
+    condition = keyset_after("2023-11-05", "id")
+    assert condition["$or"][0] == {"date": {"$lt": "2023-11-05"}}
+    assert condition["$or"][1] == {"date": "2023-11-05", "_id": {"$lt": "id"}}
+    print("✓ Keyset condition follows the page order")
+
+if __name__ == "__main__":
+    test_every_filter_has_a_sorted_index()
+    test_keyset_uses_page_order()
@@ -0,0 +1,131 @@
+"""
+Differential tests for the columnar ledger engine against the row-by-row code
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import date, timedelta
+from utils.balances import calculate_balances, summarize_net_worth
+from utils.budgets import BudgetSpendIndex
+from utils.ledger_engine import LedgerColumns, month_ends, period_ends, to_date
+
+ACCOUNTS = [
+    {"account_type": "Bank Account", "initial_amount": 10000.1},
+    {"account_type": "Cash", "initial_amount": 250.25},
+    {"account_type": "Credit Card", "initial_amount": -1200.0},
+    {"account_type": "Savings", "initial_amount": 0},
+]
+CATEGORIES = ["Food", "Rent", "Salary", "Travel", "Credit Card Payment", ""]
+
+def make_transactions(count=5000, seed=3):
+    """Random transactions, including credit card payments, unknown accounts and odd rows"""
+    random.seed(seed)
+    names = [account["account_type"] for account in ACCOUNTS] + ["Closed Account"]
+    start = date(2022, 1, 1)
+    transactions = []
+    for _ in range(count):
+        transaction = {
+            "type": random.choice(["income", "expense", "expense", "transfer", "refund"]),
+            "date": (start + timedelta(days=random.randrange(800))).strftime("%Y-%m-%d"),
+            "amount": round(random.uniform(0.01, 9999.99), 2),
+            "category": random.choice(CATEGORIES)
+        }
+        if transaction["type"] == "transfer":
+            transaction["from_account"] = random.choice(names)
+            transaction["to_account"] = random.choice(names + [""])
+        else:
+            transaction["account"] = random.choice(names)
+        transactions.append(transaction)
+    return transactions
+
+def test_balances_identical():
+    """Test that balances match calculate_balances exactly"""
+    for seed in range(5):
+        transactions = make_transactions(seed=seed)
+        assert LedgerColumns(transactions).balances(ACCOUNTS) == calculate_balances(ACCOUNTS, transactions)
+    assert LedgerColumns([]).balances(ACCOUNTS) == calculate_balances(ACCOUNTS, [])
+    print("✓ Balances match calculate_balances exactly")
+
+def test_budget_spend_identical():
+    """Test that budget spend matches BudgetSpendIndex exactly"""
+    transactions = make_transactions()
+    index = BudgetSpendIndex(transactions)
+    budgets = []
+    for _ in range(300):
+        begin = date(2022, 1, 1) + timedelta(days=random.randrange(-30, 820))
+        budgets.append({
+            "category": random.choice(CATEGORIES + ["Unknown"]),
+            "start_date": begin.strftime("%Y-%m-%d"),
+            "end_date": (begin + timedelta(days=random.randrange(-5, 90))).strftime("%Y-%m-%d")
+        })
+    spent = LedgerColumns(transactions).budget_spend(budgets).tolist()
+    expected = [index.spent(budget["category"], budget["start_date"], budget["end_date"]) for budget in budgets]
+    assert spent == expected
+    print("✓ Budget spend matches BudgetSpendIndex exactly")
+
+def test_category_and_monthly_totals():
+    """Test per-category and per-month totals against plain loops"""
+    transactions = make_transactions()
+    ledger = LedgerColumns(transactions)
+
+    expected = {}
+    for transaction in transactions:
+        if transaction["type"] == "expense" and \
+                "2022-03-01" <= transaction["date"] <= "2022-12-31":
+            expected[transaction["category"]] = expected.get(transaction["category"], 0) + transaction["amount"]
+    totals = ledger.category_totals("expense", "2022-03-01", "2022-12-31")
+    assert totals.keys() == expected.keys()
+    assert all(abs(totals[key] - expected[key]) < 1e-6 for key in expected)
+
+    months = {}
+    for transaction in transactions:
+        month = months.setdefault(transaction["date"][:7], {"income": 0, "expense": 0})
+        if transaction["type"] in month:
+            month[transaction["type"]] += transaction["amount"]
+    monthly = ledger.monthly_totals()
+    assert monthly.keys() == months.keys()
+    for key, month in months.items():
+        assert abs(monthly[key]["income"] - month["income"]) < 1e-6
+        assert abs(monthly[key]["net"] - (month["income"] - month["expense"])) < 1e-6
+    print("✓ Category and monthly totals match")
+
+def test_net_worth_series():
+    """Test each point of the series against a replay up to that date"""
+    transactions = make_transactions(count=1500)
+    ledger = LedgerColumns(transactions)
+    for frequency in ("daily", "weekly", "monthly"):
+        series = ledger.net_worth_series(ACCOUNTS, "2021-12-20", "2023-02-10", frequency)
+        for point in series[::max(1, len(series) // 40)] + [series[-1]]:
+            balances = calculate_balances(ACCOUNTS, [t for t in transactions if t["date"] <= point["date"]])
+            assets, liabilities, net_worth = summarize_net_worth(ACCOUNTS, balances)
+            assert abs(point["total_assets"] - assets) < 1e-6
+            assert abs(point["total_liabilities"] - liabilities) < 1e-6
+            assert abs(point["net_worth"] - net_worth) < 1e-6
+    print("✓ Net worth series matches a replay")
+
+def test_period_ends():
+    """Test daily, weekly and monthly period boundaries"""
+    assert [to_date(day) for day in period_ends("2023-01-30", "2023-03-15", "monthly")] == \
+        ["2023-01-31", "2023-02-28", "2023-03-15"]
+    assert [to_date(day) for day in period_ends("2023-10-11", "2023-10-25", "weekly")] == \
+        ["2023-10-15", "2023-10-22", "2023-10-25"]
+    assert len(period_ends("2023-10-01", "2023-10-03", "daily")) == 3
+    print("✓ Period ends are correct")
+
+def test_month_ends():
+    """Test that only complete month ends inside the range are returned"""
+    assert [to_date(day) for day in month_ends("2024-01-31", "2024-04-29")] == ["2024-01-31", "2024-02-29", "2024-03-31"]
+    assert [to_date(day) for day in month_ends("2023-02-01", "2023-02-28")] == ["2023-02-28"]
+    assert len(month_ends("2023-03-02", "2023-03-30")) == 0
+    assert len(month_ends("2023-05-01", "2023-04-30")) == 0
+    print("✓ Month ends are correct")
+
+if __name__ == "__main__":
+    test_balances_identical()
+    test_budget_spend_identical()
+    test_category_and_monthly_totals()
+    test_net_worth_series()
+    test_period_ends()
+    test_month_ends()
@@ -0,0 +1,80 @@
+"""
+Test script for rebuilding the derived balance store around in-flight writes
+"""
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mock_mongo
+from bson import ObjectId
+from models.finance import REBUILD_ATTEMPTS, WRITE_LEASE_TIMEOUT
+
+class CountingModel(mock_mongo.MockFinanceModel):
+    """Model that counts full-history aggregations"""
+    aggregations = 0
+
+    def get_account_totals(self):
+        CountingModel.aggregations += 1
+        return super().get_account_totals()
+
+def setup_user():
+    model = CountingModel("user1")
+    model.create_account({"account_type": "Cash", "initial_amount": 100})
+    model.create_transaction({"type": "expense", "account": "Cash", "category": "Food",
+                              "amount": 30, "date": "2024-01-05"})
+    CountingModel.aggregations = 0
+    return model
+
+def leave_lease(db, started_at):
+    """Leave a write lease behind, as a worker killed mid-write would"""
+    db.ledger_state.update_one({"user_id": "user1"},
+                               {"$push": {"write_leases": {"_id": ObjectId(), "started_at": started_at}}})
+
+def test_live_lease_blocks_marking():
+    """Test that a rebuild overlapping a running write leaves the store unmarked"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+    with mock_mongo.mock_database() as db:
+        setup_user()
+        leave_lease(db, datetime.now())
+        model = CountingModel("user1")
+        assert model.get_balances() == {"Cash": 70}
+        assert CountingModel.aggregations == REBUILD_ATTEMPTS
+        assert "balances_built_at" not in db.ledger_state.find_one({"user_id": "user1"})
+    print("✓ Live write lease keeps the store unmarked")
+
+def test_expired_lease_is_ignored():
+    """Test that a lease left by a killed worker stops blocking rebuilds once it expires"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+    with mock_mongo.mock_database() as db:
+        setup_user()
+        leave_lease(db, datetime.now() - 2 * WRITE_LEASE_TIMEOUT)
+        for _ in range(3):
+            assert CountingModel("user1").get_balances() == {"Cash": 70}
+        # Built once on the first read, then served from the store
+        assert CountingModel.aggregations == 1
+        state = db.ledger_state.find_one({"user_id": "user1"})
+        assert state["balances_built_at"] and state["write_leases"] == []
+    print("✓ Expired write lease ignored and cleared")
+
+def test_writes_release_their_lease():
+    """Test that writes, including failed ones, leave no lease behind"""
+    if not mock_mongo.available:
+        print("⚠ mongomock not installed, skipping")
+        return
+    with mock_mongo.mock_database() as db:
+        model = setup_user()
+        model.update_transaction(db.transactions.find_one()["_id"], {"amount": 40})
+        model.delete_account("Nope")
+        assert db.ledger_state.find_one({"user_id": "user1"})["write_leases"] == []
+        assert model.get_balances() == {"Cash": 60}
+    print("✓ Writes release their lease")
+
+if __name__ == "__main__":
+    test_live_lease_blocks_marking()
+    test_expired_lease_is_ignored()
+    test_writes_release_their_lease()
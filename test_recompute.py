@@ -0,0 +1,40 @@
+"""
+Test script for the parallel recompute job
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.recompute import read_checkpoint, recompute_users
+
+def test_read_checkpoint():
+    """Test that finished users are read back from the checkpoint file"""
+    assert read_checkpoint(None) == set()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recompute.checkpoint")
+        assert read_checkpoint(path) == set()
+        with open(path, "w", encoding="utf-8") as checkpoint:
+            checkpoint.write("user1\nuser2\n\n")
+        assert read_checkpoint(path) == {"user1", "user2"}
+    print("✓ Checkpoint read correctly")
+
+def test_finished_and_unknown_stores():
+    """Test that a run with every user checkpointed does nothing and unknown stores are rejected"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recompute.checkpoint")
+        with open(path, "w", encoding="utf-8") as checkpoint:
+            checkpoint.write("user1\nuser2\n")
+        summary = recompute_users(["user1", "user2"], ["balances"], workers=1, checkpoint=path)
+        assert summary["skipped"] == 2 and summary["done"] == 0 and summary["failed"] == 0
+
+    try:
+        recompute_users(["user1"], ["balances", "totals"])
+        assert False, "Unknown stores should be rejected"
+    except ValueError:
+        pass
+    print("✓ Finished users skipped and unknown stores rejected")
+
+if __name__ == "__main__":
+    test_read_checkpoint()
+    test_finished_and_unknown_stores()
@@ -0,0 +1,84 @@
+"""
+Test script for compact transaction records
+"""
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bson
+from utils.records import TransactionRecord, to_records
+from utils.balances import calculate_balances
+from utils.budgets import evaluate_budgets
+
+ACCOUNTS = [
+    {"account_type": "Bank Account", "initial_amount": 1000},
+    {"account_type": "Cash", "initial_amount": 50},
+    {"account_type": "Credit Card", "initial_amount": 0},
+]
+
+def make_transactions(count=2000):
+    """Generate random transactions in every shape the app stores"""
+    random.seed(11)
+    transactions = []
+    for _ in range(count):
+        transaction = {
+            "_id": bson.ObjectId(),
+            "type": random.choice(["income", "expense", "transfer"]),
+            "date": f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "amount": round(random.uniform(1, 500), 2),
+            "description": "Some long description " * 5,
+            "user_id": "u1"
+        }
+        if transaction["type"] == "transfer":
+            transaction["from_account"] = random.choice(["Bank Account", "Cash"])
+            transaction["to_account"] = random.choice(["Cash", "Credit Card"])
+            transaction["category"] = random.choice(["Credit Card Payment", "Cash to Bank"])
+        else:
+            transaction["account"] = random.choice(["Bank Account", "Cash", "Credit Card"])
+            transaction["category"] = random.choice(["Food", "Salary", "Rent"])
+        transactions.append(transaction)
+    return transactions
+
+def test_records_from_documents():
+    """Test that records built from decoded BSON match the original documents"""
+    transactions = make_transactions(10)
+    decoded = bson.decode_all(b"".join(bson.encode(transaction) for transaction in transactions))
+    records = to_records(decoded)
+    for record, transaction in zip(records, transactions):
+        assert record["amount"] == transaction["amount"]
+        assert record.get("account") == transaction.get("account")
+        assert record.get("to_account", "") == transaction.get("to_account", "")
+        assert "description" not in record.to_dict()
+    try:
+        records[0]["description"]
+        assert False, "records only carry computation fields"
+    except KeyError:
+        pass
+    print("✓ Records built from decoded documents")
+
+def test_computations_match_dicts():
+    """Test that balances and budgets give the same results for records and dicts"""
+    transactions = make_transactions()
+    records = to_records(transactions)
+    assert calculate_balances(ACCOUNTS, records) == calculate_balances(ACCOUNTS, transactions)
+
+    budgets = [{"category": "Food", "amount": 5000, "start_date": "2023-03-01", "end_date": "2023-05-31"}]
+    from_records = evaluate_budgets([dict(budget) for budget in budgets], records, today="2023-04-01")
+    from_dicts = evaluate_budgets([dict(budget) for budget in budgets], transactions, today="2023-04-01")
+    assert from_records == from_dicts
+    print("✓ Records give the same results as dicts")
+
+def test_strings_are_shared():
+    """Test that repeated values share a single string object"""
+    records = to_records({"type": "exp" + "ense", "date": "2023-01-01", "amount": 1,
+                          "account": "".join(["Ca", "sh"])} for _ in range(2))
+    assert records[0].type is records[1].type
+    assert records[0].account is records[1].account
+    assert records[0] == TransactionRecord("expense", "2023-01-01", 1, account="Cash")
+    print("✓ Repeated strings are shared")
+
+if __name__ == "__main__":
+    test_records_from_documents()
+    test_computations_match_dicts()
+    test_strings_are_shared()
@@ -0,0 +1,48 @@
+"""
+Test script for income and expense reports
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.reports import report_pipeline, report_rows
+
+def test_pipeline_matches_first():
+    """Test that the pipeline filters on the indexed fields before grouping"""
+    match = {"user_id": "u1", "date": {"$gte": "2023-01-01", "$lte": "2023-12-31"}}
+    pipeline = report_pipeline(match, "monthly")
+    assert pipeline[0]["$match"]["user_id"] == "u1"
+    assert pipeline[0]["$match"]["date"] == match["date"]
+    assert pipeline[0]["$match"]["type"] == {"$in": ["income", "expense"]}
+    assert pipeline[1]["$group"]["_id"] == {"$substrBytes": ["$date", 0, 7]}
+
+    native = report_pipeline({"user_id": "u1"}, "monthly", native=True)
+    assert native[1]["$group"]["_id"]["$dateToString"]["date"] == "$date_at"
+    assert report_pipeline({"user_id": "u1"}, "by-category")[1]["$group"]["_id"] == {"$ifNull": ["$category", ""]}
+
+    try:
+        report_pipeline({"user_id": "u1"}, "yearly")
+        assert False, "Unknown reports should be rejected"
+    except ValueError:
+        pass
+    print("✓ Report pipeline built correctly")
+
+def test_report_rows():
+    """Test that grouped totals get a net figure and overall totals"""
+    groups = [
+        {"_id": "2023-01", "income": 1000.0, "expense": 250.5, "count": 3},
+        {"_id": "2023-02", "income": 0, "expense": 99.999, "count": 1},
+    ]
+    report = report_rows(groups, "monthly")
+    assert report["rows"][0] == {"month": "2023-01", "income": 1000.0, "expense": 250.5, "net": 749.5, "count": 3}
+    assert report["rows"][1]["net"] == -100.0
+    assert report["totals"] == {"income": 1000.0, "expense": 350.5, "net": 649.5, "count": 4}
+
+    report = report_rows([{"_id": "Food", "income": 0, "expense": 20, "count": 2}], "by-category")
+    assert report["rows"][0]["category"] == "Food"
+    assert report_rows([], "monthly") == {"rows": [], "totals": {"income": 0, "expense": 0, "net": 0, "count": 0}}
+    print("✓ Report rows shaped correctly")
+
+if __name__ == "__main__":
+    test_pipeline_matches_first()
+    test_report_rows()
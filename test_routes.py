@@ -0,0 +1,253 @@
+"""
+Test script for page and API routes against a stubbed model
+"""
+import sys
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('AUTO_CREATE_INDEXES', 'false')
+
+import jwt
+from bson import ObjectId
+from app import create_app
+from models.finance import FinanceModel, OLDEST_FIRST
+from utils.pagination import decode_cursor
+
+app = create_app()
+routes_main = sys.modules['routes.main']
+
+TOKEN = jwt.encode({"user_id": "user1", "exp": int(time.time()) + 3600}, app.config['SECRET_KEY'], algorithm='HS256')
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+@contextmanager
+def patched(**replacements):
+    """Swap names in routes.main for the duration of the block"""
+    originals = {name: getattr(routes_main, name) for name in replacements}
+    for name, value in replacements.items():
+        setattr(routes_main, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(routes_main, name, value)
+
+def request_with(model, method, path, **kwargs):
+    """Send a request with get_model returning a stub, and return the response and flashed messages"""
+    with patched(get_model=lambda: model), app.test_client() as client:
+        response = getattr(client, method)(path, **kwargs)
+        with client.session_transaction() as session:
+            flashes = session.get('_flashes', [])
+    return response, flashes
+
+class AccountModel:
+    """Model whose accounts live in a dict, as the unique account index keeps them"""
+
+    def __init__(self, accounts=None):
+        self.accounts = dict(accounts or {})
+
+    def get_account(self, account_type, view=None, projection=None):
+        return self.accounts.get(account_type)
+
+    def create_account(self, account_data):
+        if account_data["account_type"] in self.accounts:
+            return None
+        self.accounts[account_data["account_type"]] = account_data
+        return True
+
+class DashboardModel:
+    """Model that only knows the user's data version and records every call"""
+
+    def __init__(self, version=1):
+        self.version = version
+        self.calls = []
+
+    def get_data_version(self):
+        self.calls.append("get_data_version")
+        return self.version
+
+    def active_budget_filter(self, today):
+        self.calls.append("active_budget_filter")
+        return {}
+
+class FixedDatetime(datetime):
+    """datetime whose now() is a settable day"""
+    today = datetime(2024, 3, 31, 23, 59)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.today
+
+class PageModel:
+    """Model serving newest-first transaction pages from a list"""
+
+    def __init__(self, transactions):
+        self.transactions = sorted(transactions, key=lambda t: (t["date"], t["_id"]), reverse=True)
+        self.pages = []
+
+    def get_transactions_page(self, filter_query=None, after=None, limit=50, view=None):
+        self.pages.append({"filter": filter_query, "after": after, "limit": limit})
+        rows = [t for t in self.transactions if after is None or (t["date"], t["_id"]) < after]
+        return [dict(row) for row in rows[:limit]]
+
+class ExportModel(FinanceModel):
+    """FinanceModel past the date migration that records what an export reads"""
+
+    def __init__(self):
+        self.user_id = "user1"
+        self.reads = []
+
+    def native_dates_ready(self):
+        return True
+
+    def iter_transactions(self, filter_query=None, sort=OLDEST_FIRST, projection=None, batch_size=1000, view=None):
+        self.reads.append((filter_query, sort))
+        return iter([])
+
+def test_add_account():
+    """Test that a new account is added and a duplicate one is refused with an error"""
+    form = {"account_type": "Cash", "initial_amount": "500"}
+    model = AccountModel()
+    response, flashes = request_with(model, 'post', '/accounts/add', data=form)
+    assert response.status_code == 302 and response.location.endswith('/accounts')
+    assert flashes == [("success", "Account Cash added successfully!")]
+    assert model.accounts["Cash"]["initial_amount"] == 500
+
+    response, flashes = request_with(model, 'post', '/accounts/add', data=form)
+    assert response.status_code == 302 and response.location.endswith('/accounts/add')
+    assert flashes == [("error", "Account Cash already exists!")]
+    print("✓ Duplicate account refused")
+
+def test_add_account_failure():
+    """Test that a failed insert is reported instead of flashed as a success"""
+    model = AccountModel()
+    model.create_account = lambda account_data: None
+    response, flashes = request_with(model, 'post', '/accounts/add',
+                                     data={"account_type": "Cash", "initial_amount": "500"})
+    assert response.location.endswith('/accounts/add')
+    assert flashes == [("error", "Account Cash could not be added.")]
+    print("✓ Failed account insert reported")
+
+def test_dashboard_not_modified():
+    """Test that a current ETag gets a 304 before any dashboard query, and a changed version does not"""
+    model = DashboardModel(version=7)
+    loads = []
+
+    def load(sections):
+        loads.append(sections)
+        return {"accounts": [{"account_type": "Cash", "initial_amount": 100}], "balances": {"Cash": 150}}
+
+    with patched(get_model=lambda: model, load_dashboard_data_concurrently=load):
+        client = app.test_client()
+        response = client.get('/api/dashboard/summary', headers=AUTH)
+        assert response.status_code == 200 and response.get_json()["net_worth"] == 150
+        etag = response.headers["ETag"]
+        assert "private" in response.headers["Cache-Control"] and "Authorization" in response.headers["Vary"]
+
+        model.calls.clear()
+        response = client.get('/api/dashboard/summary', headers={**AUTH, "If-None-Match": etag})
+        assert response.status_code == 304 and response.data == b""
+        assert model.calls == ["get_data_version"] and len(loads) == 1
+
+        # Any write bumps the version, so the old copy is stale
+        model.version = 8
+        response = client.get('/api/dashboard/summary', headers={**AUTH, "If-None-Match": etag})
+        assert response.status_code == 200 and response.headers["ETag"] != etag and len(loads) == 2
+    print("✓ Dashboard answers 304 before querying")
+
+def test_dashboard_budgets_day_rollover():
+    """Test that the budgets ETag changes at midnight even when the data did not"""
+    model = DashboardModel()
+
+    def load(sections):
+        return {"accounts": [], "balances": {}, "budgets": [], "rollups": []}
+
+    with patched(get_model=lambda: model, load_dashboard_data_concurrently=load, datetime=FixedDatetime):
+        client = app.test_client()
+        FixedDatetime.today = datetime(2024, 3, 31, 23, 59)
+        etag = client.get('/api/dashboard/budgets', headers=AUTH).headers["ETag"]
+        response = client.get('/api/dashboard/budgets', headers={**AUTH, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        FixedDatetime.today = datetime(2024, 4, 1, 0, 1)
+        response = client.get('/api/dashboard/budgets', headers={**AUTH, "If-None-Match": etag})
+        assert response.status_code == 200 and response.headers["ETag"] != etag
+
+        # Sections without budgets do not depend on the day
+        summary_etag = client.get('/api/dashboard/bundle?sections=summary', headers=AUTH).headers["ETag"]
+        FixedDatetime.today = datetime(2024, 4, 2, 12, 0)
+        assert client.get('/api/dashboard/bundle?sections=summary', headers=AUTH).headers["ETag"] == summary_etag
+    print("✓ Budgets ETag rolls over with the day")
+
+def test_transaction_cursor_round_trip():
+    """Test that next_cursor walks every page once and the last page has none"""
+    ids = [ObjectId() for _ in range(5)]
+    model = PageModel([
+        {"_id": ids[0], "date": "2024-01-01", "type": "expense", "amount": 1},
+        {"_id": ids[1], "date": "2024-01-02", "type": "expense", "amount": 2},
+        {"_id": ids[2], "date": "2024-01-02", "type": "expense", "amount": 3},
+        {"_id": ids[3], "date": "2024-01-02", "type": "income", "amount": 4},
+        {"_id": ids[4], "date": "2024-01-03", "type": "expense", "amount": 5},
+    ])
+    seen = []
+    cursor = None
+    with patched(get_model=lambda: model):
+        client = app.test_client()
+        while True:
+            path = '/api/transactions?limit=2' + (f'&after={cursor}' if cursor else '')
+            body = client.get(path, headers=AUTH).get_json()
+            seen.extend(transaction["_id"] for transaction in body["transactions"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+            last = body["transactions"][-1]
+            assert decode_cursor(cursor) == (last["date"], ObjectId(last["_id"]))
+
+    assert seen == [str(t["_id"]) for t in model.transactions]
+    # One extra row is asked for to learn whether another page exists
+    assert [page["limit"] for page in model.pages] == [3, 3, 3]
+    assert [page["after"] is None for page in model.pages] == [True, False, False]
+    print("✓ Transaction cursors walk every page")
+
+def test_transaction_page_filters_and_exact_fit():
+    """Test that filters reach the model and a page that exactly fits has no next_cursor"""
+    model = PageModel([{"_id": ObjectId(), "date": "2024-01-01", "type": "expense", "amount": 1}])
+    with patched(get_model=lambda: model):
+        body = app.test_client().get('/api/transactions?limit=1&type=expense&category=Food', headers=AUTH).get_json()
+    assert len(body["transactions"]) == 1 and body["next_cursor"] is None
+    assert model.pages[0]["filter"] == {"type": "expense", "category": "Food"}
+    print("✓ Filtered page passed through without a next cursor")
+
+def test_malformed_cursor():
+    """Test that a malformed after cursor is a 400 without querying"""
+    model = PageModel([])
+    with patched(get_model=lambda: model):
+        client = app.test_client()
+        for cursor in ("not-a-cursor", "WyIyMDI0LTAxLTAxIiwibm90LWFuLWlkIl0"):
+            response = client.get(f'/api/transactions?after={cursor}', headers=AUTH)
+            assert response.status_code == 400 and "Invalid cursor" in response.get_json()["error"]
+    assert model.pages == []
+    print("✓ Malformed cursor rejected")
+
+def test_export_range_matches_sort():
+    """Test that a date-bounded export ranges on the field it is sorted by, even after the date migration"""
+    model = ExportModel()
+    with patched(get_model=lambda: model):
+        response = app.test_client().get('/api/transactions/export?start_date=2024-01-01&end_date=2024-01-31'
+                                         '&type=expense', headers=AUTH)
+    assert response.status_code == 200
+    [(filter_query, sort)] = model.reads
+    assert filter_query == {"type": "expense", "date": {"$gte": "2024-01-01", "$lte": "2024-01-31"}}
+    assert sort == OLDEST_FIRST and sort[0][0] == "date"
+    print("✓ Export range uses the sorted date field")
+
+if __name__ == "__main__":
+    test_add_account()
+    test_add_account_failure()
+    test_dashboard_not_modified()
+    test_dashboard_budgets_day_rollover()
+    test_transaction_cursor_round_trip()
+    test_transaction_page_filters_and_exact_fit()
+    test_malformed_cursor()
+    test_export_range_matches_sort()
@@ -0,0 +1,57 @@
+"""
+Test script for per-account balance snapshots
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.balances import calculate_balances
+from utils.snapshots import account_filter, month_end, snapshot_points
+
+def transaction(date, amount, account="Cash", transaction_type="expense"):
+    return {"date": date, "amount": amount, "account": account, "type": transaction_type}
+
+def test_month_end_snapshots():
+    """Test that finished months are closed on their last day"""
+    transactions = [
+        transaction("2024-01-05", 10),
+        transaction("2024-01-20", 5, transaction_type="income"),
+        transaction("2024-01-20", 3, account="Bank"),
+        transaction("2024-03-01", 7),
+        transaction("2024-03-09", 1),
+    ]
+    points = list(snapshot_points(transactions, "Cash", today="2024-03-10"))
+    # March is not over yet, so its transactions stay in the tail
+    assert points == [("2024-01-31", -5, 3)]
+
+    points = list(snapshot_points(transactions, "Cash", delta=100, today="2024-04-01"))
+    assert points == [("2024-01-31", 95, 3), ("2024-03-31", 87, 2)]
+    assert month_end("2024-02-10") == "2024-02-29"
+    print("✓ Month end snapshots written")
+
+def test_every_n_snapshots():
+    """Test that busy accounts are also snapshotted every N transactions, at a day's end"""
+    transactions = [transaction(f"2024-05-{day:02d}", 1) for day in range(1, 11) for _ in range(2)]
+    points = list(snapshot_points(transactions, "Cash", every=5, today="2024-05-31"))
+    # Days are never split, so each snapshot covers whole days
+    assert points == [("2024-05-03", -6, 6), ("2024-05-06", -12, 6), ("2024-05-09", -18, 6)]
+
+    # The snapshots plus the tail give the same balance as a full replay
+    accounts = [{"account_type": "Cash", "initial_amount": 50}]
+    tail = [t for t in transactions if t["date"] > points[-1][0]]
+    expected = calculate_balances(accounts, transactions)["Cash"]
+    assert 50 + points[-1][1] + sum(-t["amount"] for t in tail) == expected
+    print("✓ Every N transactions snapshots written")
+
+def test_account_filter():
+    """Test that each branch of the account filter carries the date bounds"""
+    query = account_filter("Cash", {"$gt": "2024-01-31", "$lte": "2024-02-15"})
+    assert [list(branch)[0] for branch in query["$or"]] == ["account", "from_account", "to_account"]
+    assert all(branch["date"] == {"$gt": "2024-01-31", "$lte": "2024-02-15"} for branch in query["$or"])
+    assert account_filter("Cash") == {"$or": [{"account": "Cash"}, {"from_account": "Cash"}, {"to_account": "Cash"}]}
+    print("✓ Account filter built correctly")
+
+if __name__ == "__main__":
+    test_month_end_snapshots()
+    test_every_n_snapshots()
+    test_account_filter()
@@ -0,0 +1,62 @@
+"""
+Test script for the verified token cache
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import jwt
+from utils.token_cache import TokenCache, verify_token
+
+SECRET_KEY = "test-secret-key-for-token-cache-tests"
+
+def make_token(user_id, expires_in):
+    """Create a token that expires after the given number of seconds"""
+    return jwt.encode({"user_id": user_id, "exp": int(time.time()) + expires_in}, SECRET_KEY, algorithm="HS256")
+
+def test_hits_and_misses():
+    """Test that a verified token is served from the cache"""
+    cache = TokenCache()
+    token = make_token("user-1", 3600)
+    assert verify_token(token, SECRET_KEY, cache) == "user-1"
+    assert verify_token(token, SECRET_KEY, cache) == "user-1"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+    print("✓ Verified tokens are cached")
+
+def test_invalid_tokens_are_rejected():
+    """Test that bad and expired tokens are never cached"""
+    cache = TokenCache()
+    assert verify_token("not-a-token", SECRET_KEY, cache) is None
+    assert verify_token(make_token("user-1", -10), SECRET_KEY, cache) is None
+    assert verify_token(make_token("user-1", 3600), "wrong-secret-key-for-token-cache", cache) is None
+    assert cache.stats()["size"] == 0
+    print("✓ Invalid tokens are rejected")
+
+def test_entries_expire_with_token():
+    """Test that cached entries are evicted at the token's expiry"""
+    cache = TokenCache()
+    cache.put("token", "user-1", expires_at=1000)
+    assert cache.get("token", now=999) == "user-1"
+    assert cache.get("token", now=1000) is None
+    assert cache.stats()["size"] == 0
+    print("✓ Cached tokens expire with the token")
+
+def test_lru_eviction():
+    """Test that the least recently used token is evicted first"""
+    cache = TokenCache(max_size=2)
+    expires_at = time.time() + 3600
+    cache.put("a", "user-a", expires_at)
+    cache.put("b", "user-b", expires_at)
+    cache.get("a")
+    cache.put("c", "user-c", expires_at)
+    assert cache.get("b") is None
+    assert cache.get("a") == "user-a" and cache.get("c") == "user-c"
+    print("✓ Least recently used tokens are evicted")
+
+if __name__ == "__main__":
+    test_hits_and_misses()
+    test_invalid_tokens_are_rejected()
+    test_entries_expire_with_token()
+    test_lru_eviction()
@@ -0,0 +1,59 @@
+"""
+Asyncio MongoDB access for code paths that issue several independent queries
+
+Flask views are synchronous, so a single event loop runs in a background
+thread per process and owns the AsyncMongoClient. Views hand coroutines to
+it with run_async() and block only until the gathered queries finish.
+"""
+import asyncio
+import os
+import threading
+from flask import current_app
+from pymongo import AsyncMongoClient
+from utils.database import DATABASE_NAME, get_client_options
+
+_loop = None
+_loop_pid = None
+_client = None
+_lock = threading.Lock()
+
+def _get_loop():
+    """Get the process-wide event loop, starting its thread on first use or after a fork"""
+    global _loop, _loop_pid, _client
+    pid = os.getpid()
+    if _loop is None or _loop_pid != pid:
+        with _lock:
+            if _loop is None or _loop_pid != pid:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-mongo", daemon=True)
+                thread.start()
+                _loop = loop
+                _loop_pid = pid
+                _client = None
+    return _loop
+
+def get_async_db():
+    """Get the database from the process-wide AsyncMongoClient"""
+    global _client
+    _get_loop()
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = AsyncMongoClient(current_app.config['MONGO_URI'], **get_client_options())
+    return _client[DATABASE_NAME]
+
+def run_async(coro, timeout=None):
+    """Run a coroutine on the background loop and wait for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    return future.result(timeout)
+
+def _reset_after_fork():
+    """The loop thread does not survive a fork, so start fresh in the child"""
+    global _loop, _loop_pid, _client, _lock
+    _loop = None
+    _loop_pid = None
+    _client = None
+    _lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,78 @@
+"""
+Balance rules shared by the routes and the finance model
+"""
+
+CREDIT_CARD_ACCOUNT = "Credit Card"
+CREDIT_CARD_PAYMENT = "Credit Card Payment"
+
+def transaction_deltas(transaction):
+    """Return the (account, amount) changes a transaction makes to account balances"""
+    amount = transaction["amount"]
+
+    if transaction["type"] == "income":
+        return [(transaction.get("account"), amount)]
+
+    if transaction["type"] == "expense":
+        return [(transaction.get("account"), -amount)]
+
+    if transaction["type"] == "transfer":
+        # Special handling for credit card payments
+        if transaction.get("category") == CREDIT_CARD_PAYMENT and transaction.get("to_account") == CREDIT_CARD_ACCOUNT:
+            # Paying off credit card debt (reducing liability)
+            # Since credit card balances are negative, we ADD to reduce the debt
+            return [(transaction.get("from_account"), -amount),
+                    (transaction.get("to_account"), amount)]
+        # Regular transfer
+        return [(transaction.get("from_account"), -amount),
+                (transaction.get("to_account"), amount)]
+
+    return []
+
+def sum_deltas(transactions, sign=1):
+    """Total the balance changes of several transactions per account"""
+    totals = {}
+    for transaction in transactions:
+        for account, delta in transaction_deltas(transaction):
+            if account:
+                totals[account] = totals.get(account, 0) + sign * delta
+    return totals
+
+def calculate_balances(accounts, transactions):
+    """Calculate current balance for all accounts"""
+    # Initialize balances with initial amounts
+    balances = {account['account_type']: account['initial_amount'] for account in accounts}
+
+    # Process all transactions
+    for transaction in transactions:
+        for account, delta in transaction_deltas(transaction):
+            if account in balances:
+                balances[account] += delta
+
+    return balances
+
+def summarize_net_worth(accounts, balances):
+    """Split balances into total assets and liabilities and return them with net worth"""
+    account_types = {account['account_type'] for account in accounts}
+    total_assets = 0
+    total_liabilities = 0
+
+    for account_type, balance in balances.items():
+        if account_type not in account_types:
+            continue
+        if account_type == CREDIT_CARD_ACCOUNT:
+            # For credit cards, the balance represents debt (negative value)
+            # Liability is the absolute value of the negative balance
+            if balance < 0:
+                total_liabilities += abs(balance)
+            else:
+                # If balance is positive, it means we've overpaid (credit)
+                # This should count as a negative liability (asset)
+                total_liabilities -= balance  # Subtract because it's a credit
+        else:
+            if balance >= 0:
+                total_assets += balance
+            else:
+                total_liabilities += abs(balance)
+
+    net_worth = total_assets - total_liabilities
+    return total_assets, total_liabilities, net_worth
@@ -0,0 +1,63 @@
+"""
+Budget spend evaluation using per-category prefix sums
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+
+class BudgetSpendIndex:
+    """Expense amounts grouped by category, sorted by date, with running totals"""
+
+    def __init__(self, transactions):
+        by_category = {}
+        for transaction in transactions:
+            if transaction["type"] == "expense":
+                by_category.setdefault(transaction["category"], []).append(
+                    (transaction["date"], transaction["amount"])
+                )
+
+        self.dates = {}
+        self.totals = {}
+        for category, entries in by_category.items():
+            entries.sort(key=lambda entry: entry[0])
+            self.dates[category] = [date for date, _ in entries]
+            self.totals[category] = list(accumulate((amount for _, amount in entries), initial=0))
+
+    def spent(self, category, start_date, end_date):
+        """Total expenses in a category between two dates (inclusive)"""
+        dates = self.dates.get(category)
+        if not dates:
+            return 0
+
+        start = bisect_left(dates, start_date)
+        end = bisect_right(dates, end_date)
+        if end <= start:
+            return 0
+
+        totals = self.totals[category]
+        return totals[end] - totals[start]
+
+def evaluate_budget(budget, index, today):
+    """Add status and spending info to a budget"""
+    # Check if budget is active
+    is_active = budget["start_date"] <= today <= budget["end_date"]
+    budget["status"] = "ACTIVE" if is_active else "INACTIVE"
+
+    # Calculate spent amount for this budget period
+    spent = index.spent(budget["category"], budget["start_date"], budget["end_date"])
+    budget["spent"] = spent
+    budget["remaining"] = budget["amount"] - spent
+    budget["percentage"] = (spent / budget["amount"]) * 100 if budget["amount"] > 0 else 0
+    return budget
+
+def evaluate_budgets(budgets, transactions, today=None, active_only=False):
+    """Evaluate many budgets against one index built from the transactions"""
+    if today is None:
+        today = datetime.now().strftime("%Y-%m-%d")
+    if active_only:
+        budgets = [budget for budget in budgets if budget["start_date"] <= today <= budget["end_date"]]
+    if not budgets:
+        return []
+
+    index = BudgetSpendIndex(transactions)
+    return [evaluate_budget(budget, index, today) for budget in budgets]
@@ -0,0 +1,69 @@
+"""
+Small in-process caches for data that is read far more often than it changes
+"""
+from collections import OrderedDict
+import copy
+import threading
+import time
+
+class TTLCache:
+    """LRU cache whose entries also expire after a fixed number of seconds
+
+    Every gunicorn worker has its own copy, so writes invalidate the local
+    entry and the TTL bounds how long other workers can serve a stale one.
+    """
+
+    def __init__(self, ttl=60, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, now=None):
+        """Return a copy of the cached value for a key, or None"""
+        if now is None:
+            now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        # Callers are free to mutate what they get back
+        return copy.deepcopy(value)
+
+    def set(self, key, value, now=None):
+        """Cache a copy of a value"""
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        if now is None:
+            now = time.time()
+        value = copy.deepcopy(value)
+        with self.lock:
+            self.entries[key] = (value, now + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop the entry for a key"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self.lock:
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
@@ -1,32 +1,164 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
 from flask import current_app, g
+import atexit
 import os
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+DATABASE_NAME = 'paisatrackIN'
+
+# One client (and connection pool) per process, created on first use
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Count connection pool events for diagnostics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start counting from zero"""
+        with self.lock:
+            self.counters = {
+                "connections_created": 0,
+                "connections_closed": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "checked_out": 0,
+                "pools_cleared": 0
+            }
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        """Return a copy of the counters"""
+        with self.lock:
+            counters = dict(self.counters)
+        counters["open_connections"] = counters["connections_created"] - counters["connections_closed"]
+        return counters
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._count("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._count("checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._count("checkouts")
+        self._count("checked_out")
+
+    def connection_checked_in(self, event):
+        self._count("checked_out", -1)
+
+pool_stats = PoolStatsListener()
+
+def get_client_options():
+    """Read MongoClient pool, timeout and compression options from the environment"""
+    options = {
+        'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+        'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+        'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '0')) or None,
+        'connectTimeoutMS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '20000')),
+        'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+        'socketTimeoutMS': int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '0')) or None,
+        'waitQueueTimeoutMS': int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0')) or None,
+    }
+    compressors = os.getenv('MONGO_COMPRESSORS', '')
+    if compressors:
+        # e.g. "zstd,snappy,zlib" - zstd and snappy need their python packages installed
+        options['compressors'] = compressors
+    return options
+
+def get_client(uri=None):
+    """Get the process-wide MongoClient, creating it on first use or after a fork"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                if uri is None:
+                    uri = current_app.config['MONGO_URI']
+                _client = MongoClient(uri, event_listeners=[pool_stats], **get_client_options())
+                _client_pid = pid
+    return _client
+
+def close_client():
+    """Close the process-wide client and its pooled connections"""
+    global _client, _client_pid
+    with _client_lock:
+        client = _client
+        _client = None
+        _client_pid = None
+    if client is not None:
+        client.close()
+
+def _reset_client_after_fork():
+    """Drop the client inherited from the parent process without closing its sockets"""
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    # Locks held by other parent threads at fork time would never be released here
+    pool_stats.lock = threading.Lock()
+    pool_stats.reset()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
+atexit.register(close_client)
+
+def get_pool_stats():
+    """Get connection pool statistics for this process"""
+    stats = pool_stats.snapshot()
+    stats["pid"] = os.getpid()
+    stats["client_created"] = _client is not None and _client_pid == os.getpid()
+    stats["options"] = get_client_options()
+    return stats
+
 def init_db(app):
     """Initialize MongoDB connection"""
     # Use MONGO_URI from environment variables, with fallback to default
     app.config['MONGO_URI'] = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-    
+
 def get_db():
     """Get database connection"""
     if 'db' not in g:
-        client = MongoClient(current_app.config['MONGO_URI'])
-        g.db = client['paisatrackIN']  # Use specific database by name
-        g.mongo_client = client  # Store client reference to prevent premature closing
+        g.db = get_client()[DATABASE_NAME]  # Use specific database by name
     return g.db
 
 def close_db(e=None):
-    """Close database connection"""
-    db = g.pop('db', None)
-    client = g.pop('mongo_client', None)
-    if client is not None:
-        # Don't close the client here as it may be reused
-        pass
+    """Release the request's database handle"""
+    # The client is shared by the whole process, so it stays open
+    g.pop('db', None)
 
 def init_app(app):
     """Initialize application with database"""
-    app.teardown_appcontext(close_db)
\ No newline at end of file
+    app.teardown_appcontext(close_db)
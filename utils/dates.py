@@ -0,0 +1,79 @@
+"""
+Native date fields stored next to the "YYYY-MM-DD" strings
+
+Schema version 2 keeps the string fields the templates and APIs use and
+adds a BSON date for each of them, so range filters can use typed index
+bounds and reports can bucket with $dateTrunc. migrate_dates.py backfills
+documents written before the change.
+"""
+from datetime import datetime
+
+SCHEMA_VERSION = 2
+
+# String field -> (native field, string format) per collection
+NATIVE_DATE_FIELDS = {
+    "transactions": {
+        "date": ("date_at", "%Y-%m-%d"),
+        "added_date": ("added_at", "%Y-%m-%d %H:%M:%S"),
+    },
+    "budgets": {
+        "start_date": ("start_at", "%Y-%m-%d"),
+        "end_date": ("end_at", "%Y-%m-%d"),
+    },
+}
+
+# Marker document recording that every existing document has native dates
+MIGRATION_ID = "native_dates"
+
+def parse_date(value, date_format="%Y-%m-%d"):
+    """Parse a date string into a naive UTC datetime, or None if it does not parse"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value, date_format)
+    except (TypeError, ValueError):
+        return None
+
+def native_date_fields(collection_name, fields, partial=False):
+    """Return the native date fields matching the string dates among ``fields``
+
+    A whole document is stamped with the schema version only when all its
+    dates parsed. A partial update cannot tell whether the document's other
+    dates have native copies, so it leaves the version alone. Either way a
+    date that does not parse clears the version, which keeps the document
+    pending for migrate_dates.py to report.
+    """
+    native = {}
+    for field, (native_field, date_format) in NATIVE_DATE_FIELDS.get(collection_name, {}).items():
+        if field in fields:
+            native[native_field] = parse_date(fields[field], date_format)
+    if any(value is None for value in native.values()):
+        native["schema_version"] = None
+    elif not partial:
+        native["schema_version"] = SCHEMA_VERSION
+    return native
+
+def add_native_dates(collection_name, document, partial=False):
+    """Add native date fields to a document about to be inserted, or to the fields of a $set if partial"""
+    document.update(native_date_fields(collection_name, document, partial))
+    return document
+
+def hidden_fields(collection_name):
+    """Fields added for the database only, which reads leave out by default"""
+    fields = [native_field for native_field, _ in NATIVE_DATE_FIELDS.get(collection_name, {}).values()]
+    return fields + ["schema_version"] if fields else []
+
+def date_range_query(start_date=None, end_date=None, field="date", native_field="date_at", native=True):
+    """Filter a date field between two YYYY-MM-DD dates (inclusive)
+
+    Uses the native field once every document has one, otherwise the string
+    field, which compares correctly in the same format.
+    """
+    bounds = {}
+    if start_date:
+        bounds["$gte"] = parse_date(start_date) if native else start_date
+    if end_date:
+        bounds["$lte"] = parse_date(end_date) if native else end_date
+    if not bounds:
+        return {}
+    return {native_field if native else field: bounds}
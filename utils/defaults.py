@@ -0,0 +1,53 @@
+"""
+Default categories and info content, parsed once from the JSON files in the repo root
+"""
+from types import MappingProxyType
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_json_file(filename):
+    """Load data from a JSON file in the repo root, or None if it does not exist"""
+    path = os.path.join(BASE_DIR, filename)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+def freeze(value):
+    """Turn parsed JSON into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value):
+    """Turn a frozen structure back into plain dicts and lists"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+FALLBACK_CATEGORIES = {
+    "income": ["Salary", "Freelance", "Investment", "Gift", "Business", "Bonus", "Dividend", "Rental Income", "Other"],
+    "expense": ["Food", "Transport", "Entertainment", "Utilities", "Rent", "Healthcare",
+               "Education", "Shopping", "Travel", "Personal Care", "Insurance", "Taxes",
+               "Subscriptions", "Maintenance", "Charity", "Other"],
+    "transfer": ["Cash to Bank", "Bank to Card", "Card to Cash", "Between Accounts",
+                "Credit Card Payment", "Bank Transfer", "Investment Transfer", "Loan Payment"]
+}
+
+# Loaded at import time so request handlers never touch the filesystem
+DEFAULT_CATEGORIES = freeze(load_json_file('categories.json') or FALLBACK_CATEGORIES)
+DEFAULT_INFO = freeze(load_json_file('finance_info.json'))
+
+def default_categories():
+    """Get a mutable copy of the default categories"""
+    return thaw(DEFAULT_CATEGORIES)
+
+def default_info():
+    """Get a mutable copy of the default info content, or None if there is none"""
+    return thaw(DEFAULT_INFO)
@@ -0,0 +1,55 @@
+"""
+Streaming transaction export as CSV or newline-delimited JSON
+"""
+import csv
+import io
+import json
+
+# Format name -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson")
+}
+
+# Same column names the importer reads, so an export can be imported again
+EXPORT_FIELDS = ["id", "date", "type", "amount", "account", "from_account", "to_account",
+                 "category", "description", "added_date"]
+
+# Rows written per chunk handed to the WSGI server
+CHUNK_ROWS = 500
+
+def export_row(transaction):
+    """Flatten a transaction document into the export fields"""
+    row = {field: transaction.get(field, "") for field in EXPORT_FIELDS[1:]}
+    row["id"] = str(transaction["_id"])
+    return row
+
+def export_csv(transactions):
+    """Yield CSV text in chunks, starting with the header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for count, transaction in enumerate(transactions, start=1):
+        writer.writerow(export_row(transaction))
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_ndjson(transactions):
+    """Yield one JSON object per line, in chunks"""
+    lines = []
+    for transaction in transactions:
+        lines.append(json.dumps(export_row(transaction), default=str))
+        if len(lines) >= CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def export_transactions(transactions, file_format="csv"):
+    """Yield the export of an iterable of transactions in chunks"""
+    if file_format == "ndjson":
+        return export_ndjson(transactions)
+    return export_csv(transactions)
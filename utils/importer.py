@@ -0,0 +1,160 @@
+"""
+Streaming transaction import from CSV and JSON-lines files
+"""
+from datetime import datetime
+import csv
+import json
+from utils.validation import build_transaction
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Keep the report small however many rows fail
+MAX_REPORTED_ERRORS = 100
+
+def read_csv_rows(stream, column_map=None):
+    """Yield (line number, fields) from a CSV text stream with a header row
+
+    Header names are matched case-insensitively; ``column_map`` renames
+    columns, e.g. ``{"Txn Date": "date"}`` for a bank statement export.
+    """
+    column_map = {key.strip().lower(): value for key, value in (column_map or {}).items()}
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = [column_map.get(name.strip().lower(), name.strip().lower()) for name in header]
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        yield reader.line_num, dict(zip(names, row))
+
+def read_jsonl_rows(stream, column_map=None):
+    """Yield (line number, fields) from a JSON-lines text stream"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(fields, dict):
+            yield line_number, ValueError("Each line must be a JSON object")
+            continue
+        if column_map:
+            fields = {column_map.get(key, key): value for key, value in fields.items()}
+        yield line_number, fields
+
+def parse_column_map(text):
+    """Parse column renames written as "Txn Date=date,Debit=amount"."""
+    column_map = {}
+    for pair in (text or "").split(","):
+        if not pair.strip():
+            continue
+        source, separator, target = pair.partition("=")
+        if not separator or not source.strip() or not target.strip():
+            raise ValueError(f"Invalid column mapping: {pair.strip()}")
+        column_map[source.strip()] = target.strip().lower()
+    return column_map
+
+ROW_READERS = {
+    "csv": read_csv_rows,
+    "jsonl": read_jsonl_rows
+}
+
+class TransactionImporter:
+    """Validate rows against a user's accounts and categories and insert them in batches"""
+
+    def __init__(self, model, batch_size=1000, date_format="%Y-%m-%d", add_categories=False):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.date_format = date_format
+        self.add_categories = add_categories
+        # Names are matched case-insensitively and stored the way the user wrote them
+        self.accounts = {account["account_type"].lower(): account["account_type"]
+                         for account in model.get_accounts(view="balance")}
+        self.known_categories = {
+            transaction_type: {name.lower(): name for name in names}
+            for transaction_type, names in model.get_categories(fresh=True).items() if isinstance(names, list)
+        }
+        # Transaction type -> category names to add once the import is done
+        self.new_categories = {}
+        self.added_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.report = {"rows": 0, "imported": 0, "failed": 0, "errors": []}
+
+    def add_error(self, line_number, message):
+        """Record a rejected row"""
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"line": line_number, "error": message})
+
+    def resolve_account(self, name):
+        """Map an account name onto one of the user's accounts"""
+        account = self.accounts.get(name.lower())
+        if account is None:
+            raise ValueError(f"Unknown account '{name}'")
+        return account
+
+    def resolve_category(self, transaction_type, name):
+        """Map a category name onto the user's categories, adding it if allowed"""
+        known = self.known_categories.setdefault(transaction_type, {})
+        category = known.get(name.lower())
+        if category is None:
+            if not self.add_categories:
+                raise ValueError(f"Unknown {transaction_type} category '{name}'")
+            known[name.lower()] = category = name
+            self.new_categories.setdefault(transaction_type, []).append(name)
+        return category
+
+    def prepare(self, fields):
+        """Turn one row into a transaction document, raising ValueError if it is invalid"""
+        transaction, error = build_transaction(fields, self.date_format, self.added_date)
+        if error:
+            raise ValueError(error)
+        for key in ("account", "from_account", "to_account"):
+            if key in transaction:
+                transaction[key] = self.resolve_account(transaction[key])
+        transaction["category"] = self.resolve_category(transaction["type"], transaction["category"])
+        return transaction
+
+    def flush(self, batch):
+        """Insert a batch of (line number, transaction) pairs"""
+        inserted, errors = self.model.insert_transactions([transaction for _, transaction in batch])
+        self.report["imported"] += inserted
+        for index, message in errors:
+            self.add_error(batch[index][0], message)
+
+    def run(self, rows, progress=None):
+        """Import (line number, fields) rows and return the report
+
+        Only one batch is held in memory at a time.
+        """
+        batch = []
+        for line_number, fields in rows:
+            self.report["rows"] += 1
+            try:
+                if isinstance(fields, Exception):
+                    raise fields
+                batch.append((line_number, self.prepare(fields)))
+            except ValueError as e:
+                self.add_error(line_number, str(e))
+                continue
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+                if progress:
+                    progress(self.report)
+        if batch:
+            self.flush(batch)
+        for transaction_type, names in self.new_categories.items():
+            self.model.add_categories(transaction_type, names)
+        if progress:
+            progress(self.report)
+        return self.report
+
+def import_transactions(model, stream, file_format="csv", column_map=None, progress=None, **options):
+    """Import transactions from a text stream in one of IMPORT_FORMATS"""
+    if file_format not in ROW_READERS:
+        raise ValueError(f"Unsupported import format: {file_format}")
+    importer = TransactionImporter(model, **options)
+    return importer.run(ROW_READERS[file_format](stream, column_map), progress)
@@ -0,0 +1,102 @@
+"""
+Index declarations for the PaisaTrack collections and helpers to apply them
+"""
+import threading
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+# Every query in models/ filters by user_id first, so it leads each index
+INDEXES = {
+    "users": [
+        IndexModel([("username", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "accounts": [
+        IndexModel([("user_id", ASCENDING), ("account_type", ASCENDING)], unique=True),
+    ],
+    "transactions": [
+        # Newest-first lists and keyset pagination
+        IndexModel([("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        # Date range filters and monthly bucketing on the native date
+        IndexModel([("user_id", ASCENDING), ("date_at", DESCENDING), ("_id", DESCENDING)]),
+        # Filtered lists on the transactions page. Each ends with the (date, _id)
+        # page order so keyset pages read in index order without a blocking sort
+        IndexModel([("user_id", ASCENDING), ("type", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        # Category names rarely repeat across types, so type is checked after the fetch
+        IndexModel([("user_id", ASCENDING), ("category", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("account", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("from_account", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("to_account", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "budgets": [
+        IndexModel([("user_id", ASCENDING), ("start_date", ASCENDING), ("end_date", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("start_at", ASCENDING), ("end_at", ASCENDING)]),
+    ],
+    "categories": [
+        IndexModel([("user_id", ASCENDING)]),
+    ],
+    "balances": [
+        IndexModel([("user_id", ASCENDING), ("account_type", ASCENDING)], unique=True),
+    ],
+    "spend_rollups": [
+        IndexModel([("user_id", ASCENDING), ("type", ASCENDING), ("category", ASCENDING), ("date", ASCENDING)],
+                   unique=True),
+    ],
+    "balance_checkpoints": [
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)], unique=True),
+    ],
+    "account_snapshots": [
+        IndexModel([("user_id", ASCENDING), ("account_type", ASCENDING), ("date", ASCENDING)], unique=True),
+    ],
+    "ledger_state": [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+}
+
+def with_options(index, **options):
+    """Copy an index declaration with extra index options"""
+    document = dict(index.document)
+    keys = list(document.pop("key").items())
+    return IndexModel(keys, **document, **options)
+
+def ensure_indexes(db, background=False):
+    """Create any declared index that does not exist yet and return their names"""
+    created = []
+    for collection_name, indexes in INDEXES.items():
+        try:
+            if background:
+                # Only servers older than 4.2 honour this, newer ones never block the collection
+                indexes = [with_options(index, background=True) for index in indexes]
+            created.extend(db[collection_name].create_indexes(indexes))
+        except PyMongoError as e:
+            # Keep going so one bad collection (e.g. duplicate keys) does not block the rest
+            print(f"Error creating indexes on {collection_name}: {e}")
+    return created
+
+def index_report(db):
+    """Compare declared indexes with the ones in the database"""
+    report = {}
+    for collection_name, indexes in INDEXES.items():
+        declared = {index.document["name"] for index in indexes}
+        existing = set(db[collection_name].index_information()) - {"_id_"}
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "extra": sorted(existing - declared)
+        }
+    return report
+
+def ensure_indexes_in_background(app):
+    """Ensure indexes from a daemon thread so app startup does not wait for MongoDB"""
+    from utils.database import get_db
+
+    def run():
+        with app.app_context():
+            try:
+                created = ensure_indexes(get_db(), background=True)
+                print(f"Ensured {len(created)} indexes")
+            except Exception as e:
+                print(f"Error ensuring indexes: {e}")
+
+    thread = threading.Thread(target=run, name="ensure-indexes", daemon=True)
+    thread.start()
+    return thread
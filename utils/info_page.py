@@ -0,0 +1,57 @@
+"""
+In-memory copy of the rendered info page, shared by every user of a worker
+"""
+from datetime import datetime, timezone
+import hashlib
+import os
+import threading
+import time
+
+class InfoPageCache:
+    """Keep the rendered info page and re-render it only when its version changes
+
+    The stored version is checked at most once every ``ttl`` seconds, so other
+    worker processes pick up an update_info() within that window.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.page = None
+        self.checked_at = 0
+
+    def get(self, load_version, render, now=None):
+        """Return the cached page, checking the version and re-rendering when needed
+
+        ``load_version`` returns ``(version, updated_at)`` and ``render`` returns
+        the page HTML.
+        """
+        if now is None:
+            now = time.time()
+        with self.lock:
+            page = self.page
+            if page is not None and now - self.checked_at < self.ttl:
+                return page
+
+        version, updated_at = load_version()
+        if page is None or page["version"] != version:
+            html = render()
+            page = {
+                "version": version,
+                "html": html,
+                "etag": hashlib.sha1(html.encode("utf-8")).hexdigest(),
+                # HTTP dates have second precision
+                "last_modified": (updated_at or datetime.now(timezone.utc)).replace(microsecond=0)
+            }
+        with self.lock:
+            self.page = page
+            self.checked_at = now
+        return page
+
+    def invalidate(self):
+        """Drop the cached page so the next request renders it again"""
+        with self.lock:
+            self.page = None
+            self.checked_at = 0
+
+info_page = InfoPageCache(int(os.getenv('INFO_CACHE_TTL', '30')))
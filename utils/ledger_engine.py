@@ -0,0 +1,249 @@
+"""
+Columnar analytics over a user's ledger with NumPy
+
+Transactions are loaded once into parallel arrays (day number, amount and
+dictionary-encoded type/category/account codes) and balances, budget spend,
+category and month totals and net worth over time are computed with
+vectorized operations instead of per-row Python loops.
+"""
+import numpy as np
+from utils.balances import CREDIT_CARD_ACCOUNT
+
+TYPE_CODES = {"income": 0, "expense": 1, "transfer": 2}
+INCOME, EXPENSE, TRANSFER, OTHER = 0, 1, 2, 3
+
+# Accepted period names for net worth series
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+def to_days(dates):
+    """Convert YYYY-MM-DD strings to int32 day numbers (days since 1970-01-01)"""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int32)
+
+def to_date(day):
+    """Convert a day number back to a YYYY-MM-DD string"""
+    return str(np.datetime64(int(day), "D"))
+
+class Dictionary:
+    """Map strings to dense integer codes, with -1 for missing values"""
+
+    def __init__(self, keep_empty=False):
+        # Accounts treat "" as no account, categories keep "" as a category of its own
+        self.keep_empty = keep_empty
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        if value is None or (value == "" and not self.keep_empty):
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """Return the code of a known value, or -1"""
+        return self.codes.get(value, -1)
+
+    def __len__(self):
+        return len(self.values)
+
+class LedgerColumns:
+    """A user's transactions as NumPy columns, in their original order"""
+
+    def __init__(self, transactions):
+        self.categories = Dictionary(keep_empty=True)
+        self.accounts = Dictionary()
+        dates, amounts, types, categories, accounts, from_accounts, to_accounts = [], [], [], [], [], [], []
+        for transaction in transactions:
+            dates.append(transaction["date"])
+            amounts.append(transaction["amount"])
+            types.append(TYPE_CODES.get(transaction["type"], OTHER))
+            categories.append(self.categories.encode(transaction.get("category")))
+            accounts.append(self.accounts.encode(transaction.get("account")))
+            from_accounts.append(self.accounts.encode(transaction.get("from_account")))
+            to_accounts.append(self.accounts.encode(transaction.get("to_account")))
+
+        self.day = to_days(dates)
+        self.amount = np.asarray(amounts, dtype=np.float64)
+        self.type = np.asarray(types, dtype=np.int8)
+        self.category = np.asarray(categories, dtype=np.int32)
+        self.account = np.asarray(accounts, dtype=np.int32)
+        self.from_account = np.asarray(from_accounts, dtype=np.int32)
+        self.to_account = np.asarray(to_accounts, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.amount)
+
+    def legs(self):
+        """Return (account code, delta) arrays with two legs per transaction, in transaction order
+
+        Mirrors utils.balances.transaction_deltas: income adds to the account,
+        expense subtracts from it and a transfer (credit card payments
+        included) moves the amount from from_account to to_account. The
+        second leg of income and expense rows has account code -1.
+        """
+        count = len(self)
+        first_account = np.where(self.type == TRANSFER, self.from_account, self.account)
+        first_delta = np.where(self.type == INCOME, self.amount, -self.amount)
+        second_account = np.where(self.type == TRANSFER, self.to_account, -1)
+        # Rows of any other type change nothing
+        first_account = np.where(self.type == OTHER, -1, first_account)
+
+        # Interleave so each account sees its deltas in the same order as a row-by-row replay
+        codes = np.empty(2 * count, dtype=np.int32)
+        deltas = np.empty(2 * count, dtype=np.float64)
+        codes[0::2], codes[1::2] = first_account, second_account
+        deltas[0::2], deltas[1::2] = first_delta, self.amount
+        return codes, deltas
+
+    def account_codes(self, accounts):
+        """Return the ledger code of each account, -1 if it has no transactions"""
+        return np.asarray([self.accounts.code(account["account_type"]) for account in accounts], dtype=np.int32)
+
+    def account_positions(self, accounts, codes):
+        """Map ledger account codes to positions in ``accounts``, -1 for any other account"""
+        # The extra last slot stays -1, so code -1 (no account) also maps to -1
+        slots = np.full(len(self.accounts) + 1, -1, dtype=np.int32)
+        ledger_codes = self.account_codes(accounts)
+        slots[ledger_codes[ledger_codes >= 0]] = np.flatnonzero(ledger_codes >= 0)
+        return slots[codes]
+
+    def balances(self, accounts):
+        """Current balance of each account, identical to utils.balances.calculate_balances"""
+        codes, deltas = self.legs()
+        positions = self.account_positions(accounts, codes)
+        known = positions >= 0
+
+        # Opening amounts go first so the additions happen in the same order as the Python loop
+        initial = np.asarray([account["initial_amount"] for account in accounts], dtype=np.float64)
+        weights = np.concatenate([initial, deltas[known]])
+        indexes = np.concatenate([np.arange(len(accounts)), positions[known]])
+        totals = np.bincount(indexes, weights=weights, minlength=len(accounts))
+
+        balances = {}
+        for account, total in zip(accounts, totals.tolist()):
+            balances[account["account_type"]] = total
+        return balances
+
+    def expense_index(self):
+        """Per-category expense days and running totals, sorted by day"""
+        if getattr(self, "_expense_index", None) is None:
+            index = {}
+            expenses = np.flatnonzero(self.type == EXPENSE)
+            expenses = expenses[self.category[expenses] >= 0]
+            for code in np.unique(self.category[expenses]):
+                rows = expenses[self.category[expenses] == code]
+                rows = rows[np.argsort(self.day[rows], kind="stable")]
+                totals = np.concatenate([[0.0], np.cumsum(self.amount[rows])])
+                index[int(code)] = (self.day[rows], totals)
+            self._expense_index = index
+        return self._expense_index
+
+    def budget_spend(self, budgets):
+        """Expenses in each budget's category and period (inclusive), like BudgetSpendIndex"""
+        spent = np.zeros(len(budgets), dtype=np.float64)
+        if not budgets:
+            return spent
+        index = self.expense_index()
+        categories = np.asarray([self.categories.code(budget["category"]) for budget in budgets])
+        starts = to_days([budget["start_date"] for budget in budgets])
+        ends = to_days([budget["end_date"] for budget in budgets])
+        # One searchsorted call per category covers all of its budgets
+        for code in np.unique(categories):
+            if code < 0 or int(code) not in index:
+                continue
+            days, totals = index[int(code)]
+            selected = np.flatnonzero(categories == code)
+            start = np.searchsorted(days, starts[selected], side="left")
+            end = np.searchsorted(days, ends[selected], side="right")
+            spent[selected] = np.where(end > start, totals[end] - totals[np.minimum(start, end)], 0.0)
+        return spent
+
+    def date_mask(self, start_date=None, end_date=None):
+        """Rows between two dates (inclusive)"""
+        mask = np.ones(len(self), dtype=bool)
+        if start_date:
+            mask &= self.day >= to_days(start_date)
+        if end_date:
+            mask &= self.day <= to_days(end_date)
+        return mask
+
+    def category_totals(self, transaction_type="expense", start_date=None, end_date=None):
+        """Total amount per category for one transaction type"""
+        mask = self.date_mask(start_date, end_date) & (self.type == TYPE_CODES[transaction_type]) & (self.category >= 0)
+        totals = np.bincount(self.category[mask], weights=self.amount[mask], minlength=len(self.categories))
+        return {self.categories.values[code]: total for code, total in enumerate(totals.tolist()) if total}
+
+    def monthly_totals(self, start_date=None, end_date=None):
+        """Income, expense and net per YYYY-MM month with any activity"""
+        mask = self.date_mask(start_date, end_date)
+        months = self.day[mask].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        if not len(months):
+            return {}
+        unique_months, month_index = np.unique(months, return_inverse=True)
+        amounts = self.amount[mask]
+        types = self.type[mask]
+        income = np.bincount(month_index, weights=np.where(types == INCOME, amounts, 0), minlength=len(unique_months))
+        expense = np.bincount(month_index, weights=np.where(types == EXPENSE, amounts, 0), minlength=len(unique_months))
+        return {
+            str(np.datetime64(int(month), "M")): {"income": inc, "expense": exp, "net": inc - exp}
+            for month, inc, exp in zip(unique_months.tolist(), income.tolist(), expense.tolist())
+        }
+
+    def balance_matrix(self, accounts, points):
+        """Balance of every account at the end of each day number in ``points`` (ascending)"""
+        codes, deltas = self.legs()
+        days = np.repeat(self.day, 2)
+        positions = self.account_positions(accounts, codes)
+
+        # Each delta lands on the first point on or after its day, later ones are dropped
+        point_index = np.searchsorted(points, days, side="left")
+        keep = (positions >= 0) & (point_index < len(points))
+        matrix = np.zeros((len(points), len(accounts)), dtype=np.float64)
+        np.add.at(matrix, (point_index[keep], positions[keep]), deltas[keep])
+
+        initial = np.asarray([account["initial_amount"] for account in accounts], dtype=np.float64)
+        return np.cumsum(matrix, axis=0) + initial
+
+    def net_worth_series(self, accounts, start_date, end_date, frequency="daily"):
+        """Assets, liabilities and net worth at the end of each period between two dates"""
+        points = period_ends(start_date, end_date, frequency)
+        matrix = self.balance_matrix(accounts, points)
+        credit_card = np.asarray([account["account_type"] == CREDIT_CARD_ACCOUNT for account in accounts], dtype=bool)
+
+        # Same rules as utils.balances.summarize_net_worth
+        assets = np.where(~credit_card & (matrix >= 0), matrix, 0).sum(axis=1)
+        liabilities = np.where(credit_card, -matrix, np.where(matrix < 0, -matrix, 0)).sum(axis=1)
+        return [
+            {"date": to_date(day), "total_assets": asset, "total_liabilities": liability, "net_worth": asset - liability}
+            for day, asset, liability in zip(points.tolist(), assets.tolist(), liabilities.tolist())
+        ]
+
+def period_ends(start_date, end_date, frequency="daily"):
+    """Day numbers closing each day, week (Sunday) or month between two dates, ending on end_date"""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    start, end = int(to_days(start_date)), int(to_days(end_date))
+    if end < start:
+        return np.empty(0, dtype=np.int32)
+    if frequency == "daily":
+        points = np.arange(start, end + 1, dtype=np.int32)
+    elif frequency == "weekly":
+        # Day 3 (1970-01-04) was a Sunday
+        first_sunday = start + (3 - start) % 7
+        points = np.arange(first_sunday, end + 1, 7, dtype=np.int32)
+    else:
+        months = np.arange(np.datetime64(to_date(start), "M"), np.datetime64(to_date(end), "M") + 1)
+        points = ((months + 1).astype("datetime64[D]") - 1).astype(np.int32)
+    points = points[points < end]
+    return np.append(points, end).astype(np.int32)
+
+def month_ends(start_date, end_date):
+    """Day numbers of the last day of every month that ends between two dates (inclusive)"""
+    start, end = int(to_days(start_date)), int(to_days(end_date))
+    if end < start:
+        return np.empty(0, dtype=np.int32)
+    months = np.arange(np.datetime64(to_date(start), "M"), np.datetime64(to_date(end), "M") + 1)
+    points = ((months + 1).astype("datetime64[D]") - 1).astype(np.int32)
+    return points[(points >= start) & (points <= end)]
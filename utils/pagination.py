@@ -0,0 +1,28 @@
+"""
+Opaque cursors for keyset pagination over (date, _id)
+"""
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+
+def encode_cursor(document):
+    """Encode the sort key of the last document on a page as an opaque token"""
+    key = json.dumps([document["date"], str(document["_id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+def decode_cursor(token):
+    """Decode a cursor token back into its (date, ObjectId) sort key"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        date, object_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(date), ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+def keyset_after(date, object_id):
+    """Filter matching documents that sort after (date, _id) in newest-first order"""
+    return {"$or": [
+        {"date": {"$lt": date}},
+        {"date": date, "_id": {"$lt": object_id}}
+    ]}
@@ -0,0 +1,119 @@
+"""
+Recompute derived data for many users in parallel
+
+Users are spread over a process pool. Each worker process pushes its own
+app context, so utils.database gives it its own MongoClient and pool.
+Users that finish are appended to a checkpoint file, and a later run with
+the same file skips them, so an interrupted job resumes where it stopped.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from models.finance import FinanceModel
+
+# Store name -> FinanceModel method that rebuilds it from transaction history
+RECOMPUTE_STORES = {
+    "balances": "rebuild_balances",
+    "rollups": "rebuild_rollups",
+    "history": "rebuild_balance_history",
+}
+
+# Times a user is recomputed when their data changes while it runs
+MAX_ATTEMPTS = 3
+
+_app_context = None
+
+def init_worker():
+    """Push an app context for the lifetime of a worker process"""
+    global _app_context
+    from app import create_app
+
+    # The parent process is in charge of indexes, workers only recompute
+    os.environ["AUTO_CREATE_INDEXES"] = "false"
+    _app_context = create_app().app_context()
+    _app_context.push()
+
+def recompute_user(user_id, stores, pause=0):
+    """Rebuild some derived stores for one user and report what was written"""
+    started = time.time()
+    result = {"user_id": user_id, "counts": {}, "attempts": 0, "error": None}
+    try:
+        model = FinanceModel(user_id)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            result["attempts"] = attempt
+            version = model.get_data_version()
+            for store in stores:
+                written = getattr(model, RECOMPUTE_STORES[store])()
+                result["counts"][store] = written if isinstance(written, int) else len(written)
+            # A write during the rebuild may be missing from it, so go again
+            if model.get_data_version() == version:
+                break
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.time() - started
+
+    # Throttle: each worker rests between users to leave the primary some headroom
+    if pause:
+        time.sleep(pause)
+    return result
+
+def read_checkpoint(path):
+    """Return the user IDs a checkpoint file records as finished"""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as checkpoint:
+        return {line.strip() for line in checkpoint if line.strip()}
+
+def recompute_users(user_ids, stores, workers=None, checkpoint=None, pause=0, progress=None):
+    """Recompute stores for many users across a process pool and return a summary
+
+    Only a few users per worker are queued at a time, so memory stays flat
+    for any number of users. Failed users are left out of the checkpoint
+    and are retried by the next run.
+    """
+    unknown = [store for store in stores if store not in RECOMPUTE_STORES]
+    if unknown:
+        raise ValueError(f"Unknown stores: {', '.join(unknown)}")
+
+    workers = workers or os.cpu_count() or 1
+    finished = read_checkpoint(checkpoint)
+    pending = iter([user_id for user_id in user_ids if user_id not in finished])
+    summary = {"users": len(user_ids), "skipped": len(finished & set(user_ids)),
+               "done": 0, "failed": 0, "retried": 0, "started": time.time()}
+
+    log = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+    # pymongo clients are not fork-safe, so workers start from a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as executor:
+            running = set()
+            while True:
+                while len(running) < workers * 2:
+                    user_id = next(pending, None)
+                    if user_id is None:
+                        break
+                    running.add(executor.submit(recompute_user, user_id, stores, pause))
+                if not running:
+                    break
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result["error"]:
+                        summary["failed"] += 1
+                    else:
+                        summary["done"] += 1
+                        if log:
+                            log.write(f"{result['user_id']}\n")
+                            log.flush()
+                    if result["attempts"] > 1:
+                        summary["retried"] += 1
+                    if progress:
+                        progress(result, summary)
+    finally:
+        if log:
+            log.close()
+
+    summary["seconds"] = time.time() - summary.pop("started")
+    return summary
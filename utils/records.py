@@ -0,0 +1,68 @@
+"""
+Compact transaction records for computations over a user's whole history
+"""
+import sys
+
+class TransactionRecord:
+    """The fields balance and budget computations read, without the dict overhead
+
+    Supports ``record["amount"]`` and ``record.get("account")`` so the helpers
+    in utils/balances.py and utils/budgets.py accept records and dicts alike.
+    """
+
+    __slots__ = ("type", "date", "amount", "category", "account", "from_account", "to_account")
+
+    def __init__(self, type, date, amount, category=None, account=None, from_account=None, to_account=None):
+        self.type = type
+        self.date = date
+        self.amount = amount
+        self.category = category
+        self.account = account
+        self.from_account = from_account
+        self.to_account = to_account
+
+    @classmethod
+    def from_document(cls, document):
+        """Build a record from a transaction document"""
+        get = document.get
+        # Types, dates, categories and accounts repeat constantly, so share one copy of each
+        return cls(
+            intern(get("type")),
+            intern(get("date")),
+            get("amount", 0),
+            intern(get("category")),
+            intern(get("account")),
+            intern(get("from_account")),
+            intern(get("to_account"))
+        )
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        """Return a field, or the default when it is unset"""
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self):
+        """Return the set fields as a plain dict for JSON or templates"""
+        return {field: getattr(self, field) for field in self.__slots__ if getattr(self, field) is not None}
+
+    def __eq__(self, other):
+        if not isinstance(other, TransactionRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"TransactionRecord({self.to_dict()!r})"
+
+def intern(value):
+    """Intern strings, leave anything else (including None) alone"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def to_records(documents):
+    """Convert transaction documents to records"""
+    return [TransactionRecord.from_document(document) for document in documents]
@@ -0,0 +1,62 @@
+"""
+Income and expense reports computed by MongoDB aggregation
+
+The pipelines match on user_id and the date range first, so the server
+walks the (user_id, date) index for the range and groups inside MongoDB;
+only one small row per month or category comes back to Python.
+"""
+
+# Report name -> what transactions are grouped by
+REPORT_GROUPS = ("monthly", "by-category")
+
+# Transfers move money between accounts and are neither income nor expense
+REPORT_TYPES = ["income", "expense"]
+
+def month_key(native=False):
+    """Expression for a transaction's YYYY-MM month"""
+    if native:
+        return {"$dateToString": {"format": "%Y-%m", "date": "$date_at"}}
+    # Date strings are YYYY-MM-DD, so the month is their first 7 bytes
+    return {"$substrBytes": ["$date", 0, 7]}
+
+def sum_of(transaction_type):
+    """Accumulator summing the amounts of one transaction type"""
+    return {"$sum": {"$cond": [{"$eq": ["$type", transaction_type]}, "$amount", 0]}}
+
+def report_pipeline(match, report="monthly", native=False):
+    """Aggregation pipeline totalling income and expense per month or per category"""
+    if report not in REPORT_GROUPS:
+        raise ValueError(f"Unknown report: {report}")
+    key = month_key(native) if report == "monthly" else {"$ifNull": ["$category", ""]}
+    return [
+        {"$match": {**match, "type": {"$in": REPORT_TYPES}}},
+        {"$group": {
+            "_id": key,
+            "income": sum_of("income"),
+            "expense": sum_of("expense"),
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"_id": 1}}
+    ]
+
+def report_rows(groups, report="monthly"):
+    """Shape $group output into report rows with a net figure and overall totals"""
+    label = "month" if report == "monthly" else "category"
+    rows = []
+    totals = {"income": 0, "expense": 0, "net": 0, "count": 0}
+    for group in groups:
+        income, expense = round(group["income"], 2), round(group["expense"], 2)
+        rows.append({
+            label: group["_id"],
+            "income": income,
+            "expense": expense,
+            "net": round(income - expense, 2),
+            "count": group["count"]
+        })
+        totals["income"] += income
+        totals["expense"] += expense
+        totals["count"] += group["count"]
+    totals["income"] = round(totals["income"], 2)
+    totals["expense"] = round(totals["expense"], 2)
+    totals["net"] = round(totals["income"] - totals["expense"], 2)
+    return {"rows": rows, "totals": totals}
@@ -0,0 +1,19 @@
+"""
+Daily spend rollups keyed by category, transaction type and date
+"""
+
+def rollup_key(transaction):
+    """Return the (category, type, date) rollup a transaction belongs to"""
+    return (transaction.get("category", ""), transaction["type"], transaction["date"])
+
+def rollup_deltas(added=(), removed=()):
+    """Total (amount, count) changes per rollup for added and removed transactions"""
+    deltas = {}
+    for sign, transactions in ((1, added), (-1, removed)):
+        for transaction in transactions:
+            key = rollup_key(transaction)
+            amount, count = deltas.get(key, (0, 0))
+            deltas[key] = (amount + sign * transaction["amount"], count + sign)
+
+    # Edits that leave a rollup untouched need no write
+    return {key: change for key, change in deltas.items() if change != (0, 0)}
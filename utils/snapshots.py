@@ -0,0 +1,75 @@
+"""
+Per-account balance snapshots for "balance as of a date" queries
+
+A snapshot stores an account's cumulative transaction delta at the end of
+a day. The balance on any date is then the account's opening amount plus
+the nearest earlier snapshot plus the transactions after it, which the
+snapshot schedule keeps to at most a month or a few hundred rows.
+"""
+from datetime import datetime, timedelta
+from utils.balances import transaction_deltas
+
+# Snapshot an account after this many transactions, as well as at each month end
+SNAPSHOT_EVERY = 500
+
+def account_filter(account_type, date_filter=None):
+    """Filter transactions that move money in or out of an account
+
+    Each branch carries the date bounds so it can use its own
+    (user_id, account field, date) index.
+    """
+    branches = []
+    for field in ("account", "from_account", "to_account"):
+        branch = {field: account_type}
+        if date_filter:
+            branch["date"] = date_filter
+        branches.append(branch)
+    return {"$or": branches}
+
+def account_delta(transaction, account_type):
+    """Total change a transaction makes to one account"""
+    return sum(delta for account, delta in transaction_deltas(transaction) if account == account_type)
+
+def accounts_touched(transactions):
+    """Every account a set of transactions moves money in or out of"""
+    return {account for transaction in transactions
+            for account, _ in transaction_deltas(transaction) if account}
+
+def month_end(day):
+    """Last day of the month of a YYYY-MM-DD day"""
+    first = datetime.strptime(day[:7] + "-01", "%Y-%m-%d")
+    return ((first + timedelta(days=32)).replace(day=1) - timedelta(days=1)).strftime("%Y-%m-%d")
+
+def snapshot_points(transactions, account_type, delta=0, every=SNAPSHOT_EVERY, today=None):
+    """Yield (date, cumulative delta, transactions since the previous snapshot) for one account
+
+    ``transactions`` must be sorted by date and start after the previous
+    snapshot, whose delta is passed in. A month with activity is closed at
+    its last day once it is over, and a day that brings the count since the
+    last snapshot to ``every`` is closed on that day. Nothing is dated today
+    or later, since such snapshots would be dropped by the next write.
+    """
+    if today is None:
+        today = datetime.now().strftime("%Y-%m-%d")
+    count = 0
+    current_day = None
+    for transaction in transactions:
+        day = transaction["date"]
+        if count and day != current_day:
+            end = month_end(current_day)
+            if end < day and end < today:
+                yield end, delta, count
+                count = 0
+            elif count >= every and current_day < today:
+                yield current_day, delta, count
+                count = 0
+        delta += account_delta(transaction, account_type)
+        count += 1
+        current_day = day
+
+    if count:
+        end = month_end(current_day)
+        if end < today:
+            yield end, delta, count
+        elif count >= every and current_day < today:
+            yield current_day, delta, count
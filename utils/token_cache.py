@@ -0,0 +1,71 @@
+"""
+Bounded cache of verified JWTs for the API authentication check
+"""
+from collections import OrderedDict
+import threading
+import time
+import jwt
+
+class TokenCache:
+    """LRU cache of token -> user_id that drops entries when the token expires"""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token, now=None):
+        """Return the cached user_id for a token, or None"""
+        if now is None:
+            now = time.time()
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, expires_at = entry
+            if expires_at <= now:
+                del self.entries[token]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(token)
+            self.hits += 1
+            return user_id
+
+    def put(self, token, user_id, expires_at):
+        """Cache a verified token until it expires"""
+        with self.lock:
+            self.entries[token] = (user_id, expires_at)
+            self.entries.move_to_end(token)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every cached token"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "max_size": self.max_size}
+
+def verify_token(token, secret_key, cache):
+    """Verify a JWT and return its user_id, using the cache when possible"""
+    user_id = cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    try:
+        payload = jwt.decode(token, secret_key, algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        # Covers expired tokens too (ExpiredSignatureError is a subclass)
+        return None
+
+    user_id = payload.get('user_id')
+    # Only tokens with an expiry are cached, so a cached entry can never outlive its token
+    if user_id and 'exp' in payload:
+        cache.put(token, user_id, payload['exp'])
+    return user_id
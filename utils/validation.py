@@ -0,0 +1,70 @@
+"""
+Validation rules for transactions entered through the form or imported in bulk
+"""
+from datetime import datetime
+
+TRANSACTION_TYPES = ("income", "expense", "transfer")
+
+def parse_amount(value):
+    """Parse an amount, allowing thousands separators in text values"""
+    if isinstance(value, str):
+        value = value.strip().replace(",", "")
+    return float(value)
+
+def build_transaction(fields, date_format="%Y-%m-%d", added_date=None):
+    """Build a transaction document from form or import fields
+
+    Returns ``(transaction, None)`` when the fields are valid, otherwise
+    ``(None, error_message)``. Dates are stored as YYYY-MM-DD whatever
+    ``date_format`` they arrive in.
+    """
+    def field(name):
+        value = fields.get(name)
+        return value.strip() if isinstance(value, str) else (value or "")
+
+    transaction_type = field("type")
+    if not transaction_type:
+        return None, "Transaction type is required!"
+    if transaction_type not in TRANSACTION_TYPES:
+        return None, "Transaction type must be income, expense or transfer!"
+
+    if not field("date"):
+        return None, "Date is required!"
+    try:
+        date = datetime.strptime(str(field("date")), date_format).strftime("%Y-%m-%d")
+    except ValueError:
+        return None, f"Date must match the format {date_format}!"
+
+    try:
+        amount = parse_amount(field("amount") or 0)
+    except (TypeError, ValueError):
+        return None, "Amount must be a number!"
+    if amount <= 0:
+        return None, "Amount must be greater than zero!"
+
+    transaction = {
+        "type": transaction_type,
+        "date": date,
+        "amount": amount,
+        "description": field("description"),
+        "added_date": added_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "category": field("category")
+    }
+
+    if transaction_type in ["income", "expense"]:
+        transaction["account"] = field("account")
+        if not transaction["account"]:
+            return None, "Account is required for income/expense transactions!"
+        if not transaction["category"]:
+            return None, "Category is required for income/expense transactions!"
+    else:
+        transaction["from_account"] = field("from_account")
+        transaction["to_account"] = field("to_account")
+        if not transaction["from_account"]:
+            return None, "From account is required for transfer transactions!"
+        if not transaction["to_account"]:
+            return None, "To account is required for transfer transactions!"
+        if not transaction["category"]:
+            return None, "Category is required for transfer transactions!"
+
+    return transaction, None
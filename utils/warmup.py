@@ -0,0 +1,23 @@
+"""
+Per-process warm-up run by server workers before they accept requests
+"""
+from utils.database import get_db, get_pool_stats
+
+def warm_up(app):
+    """Open the MongoDB pool and render the cached info page so the first requests skip both"""
+    from models.finance import FinanceModel
+    from routes.main import cached_info_page
+
+    # The info page renders templates and builds URLs, so it needs a request context
+    with app.test_request_context('/info'):
+        try:
+            get_db().command('ping')
+            print(f"Worker warmed up: {get_pool_stats()['open_connections']} MongoDB connection(s) open")
+        except Exception as e:
+            # The worker still serves requests, the pool just connects lazily
+            print(f"Error warming up worker: {e}")
+            return
+        try:
+            cached_info_page(FinanceModel())
+        except Exception as e:
+            print(f"Error pre-rendering info page: {e}")